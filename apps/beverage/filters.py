@@ -1,17 +1,17 @@
-from django.utils import timezone
-
 from apps.beverage.models import Beverage
+from apps.partner.happy_hours import get_active_happy_hour_q
 
 from django_filters import rest_framework as filters
 
 
 class BeverageFilter(filters.FilterSet):
     availability_status = filters.BooleanFilter(field_name="availability_status")
+    category = filters.NumberFilter(field_name="category_id")
     in_happy_hour = filters.BooleanFilter(method="filter_happy_hour")
 
     class Meta:
         model = Beverage
-        fields = ["availability_status"]
+        fields = ["availability_status", "category"]
 
     def filter_happy_hour(self, queryset, name, value):
         """
@@ -19,9 +19,5 @@ class BeverageFilter(filters.FilterSet):
         within their happy hour period.
         """
         if value:
-            current_time = timezone.localtime().time()
-            queryset = queryset.filter(
-                establishment__happyhours_start__lte=current_time,
-                establishment__happyhours_end__gte=current_time,
-            )
+            queryset = queryset.filter(get_active_happy_hour_q("establishment__"))
         return queryset
@@ -3,5 +3,6 @@ from django.db import models
 
 class BeverageManager(models.Manager):
     def get_queryset(self):
-        return super().get_queryset().filter(establishment__owner__is_blocked=False)
+        # is_visible mirrors establishment__owner__is_blocked, see apps.partner.visibility
+        return super().get_queryset().filter(is_visible=True)
 
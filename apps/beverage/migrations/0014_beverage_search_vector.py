@@ -0,0 +1,59 @@
+# Generated by Django 4.2 on 2026-10-18 10:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("beverage", "0013_beverage_beverage_be_name_57c27e_idx_and_more"),
+        ("partner", "0013_establishment_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="beverage",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # same vectors as apps.partner.search at the time of writing
+        migrations.RunSQL(
+            sql="""
+                UPDATE partner_establishment
+                SET search_vector = setweight(to_tsvector('simple', COALESCE(name, '')), 'A')
+                    || setweight(to_tsvector('simple', COALESCE((
+                        SELECT string_agg(beverage_beverage.name, ' ')
+                        FROM beverage_beverage
+                        WHERE beverage_beverage.establishment_id = partner_establishment.id
+                    ), '')), 'B');
+
+                UPDATE beverage_beverage
+                SET search_vector = setweight(to_tsvector('simple', COALESCE(name, '')), 'A')
+                    || setweight(to_tsvector('simple', COALESCE((
+                        SELECT beverage_category.name
+                        FROM beverage_category
+                        WHERE beverage_category.id = beverage_beverage.category_id
+                    ), '')), 'B')
+                    || setweight(to_tsvector('simple', COALESCE((
+                        SELECT partner_establishment.name
+                        FROM partner_establishment
+                        WHERE partner_establishment.id = beverage_beverage.establishment_id
+                    ), '')), 'C');
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="beverage",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="beverage_search_vector_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="beverage",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="beverage_name_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("beverage", "0014_beverage_search_vector"),
+        ("partner", "0014_establishment_is_visible"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="beverage",
+            name="is_visible",
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE beverage_beverage
+                SET is_visible = FALSE
+                FROM partner_establishment
+                WHERE partner_establishment.id = beverage_beverage.establishment_id
+                    AND NOT partner_establishment.is_visible
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="beverage",
+            index=models.Index(
+                condition=models.Q(("is_visible", True)),
+                fields=["establishment", "name"],
+                name="beverage_visible_menu_idx",
+            ),
+        ),
+    ]
@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from apps.beverage.managers import BeverageManager
@@ -27,11 +29,31 @@ class Beverage(models.Model):
     establishment = models.ForeignKey(
         Establishment, on_delete=models.CASCADE, related_name="beverages"
     )
+    # copy of establishment.is_visible, see apps.partner.visibility
+    is_visible = models.BooleanField(default=True, editable=False)
+    # name, category and establishment names, maintained by apps.partner.signals
+    search_vector = SearchVectorField(null=True, editable=False)
     objects = BeverageManager()
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # establishment as stored, save() re-derives is_visible when it changes
+        instance._loaded_establishment_id = instance.__dict__.get('establishment_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self._state.adding or self.establishment_id != getattr(self, '_loaded_establishment_id', None):
+            self.is_visible = self.establishment.is_visible
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'is_visible'}
+        super().save(*args, **kwargs)
+        self._loaded_establishment_id = self.establishment_id
+
     class Meta:
         verbose_name = "Beverage"
         verbose_name_plural = "Beverages"
@@ -39,4 +61,9 @@ class Beverage(models.Model):
         indexes = [
             models.Index(fields=['name']),
             models.Index(fields=['availability_status']),
+            GinIndex(fields=['search_vector'], name='beverage_search_vector_idx'),
+            GinIndex(fields=['name'], name='beverage_name_trgm_idx', opclasses=['gin_trgm_ops']),
+            models.Index(
+                fields=['establishment', 'name'], name='beverage_visible_menu_idx', condition=models.Q(is_visible=True)
+            ),
         ]
@@ -1,5 +1,7 @@
 from drf_spectacular.utils import (
     OpenApiExample,
+    OpenApiParameter,
+    OpenApiTypes,
     extend_schema_serializer,
     extend_schema,
 )
@@ -59,3 +61,21 @@ beverage_serializer_schema = extend_schema_serializer(
         ),
     ]
 )
+
+category_expand_parameters = [
+    OpenApiParameter(
+        name="expand",
+        description="beverages adds the first beverages of every category",
+        required=False,
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        enum=["beverages"],
+    ),
+    OpenApiParameter(
+        name="beverages_limit",
+        description="Beverages per category with expand=beverages, 1 to 50, default 5",
+        required=False,
+        type=OpenApiTypes.INT,
+        location=OpenApiParameter.QUERY,
+    ),
+]
@@ -1,16 +1,38 @@
+from urllib.parse import urlencode
+
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
 from rest_framework import serializers
+from rest_framework.reverse import reverse
 from .models import Beverage, Category
 from .schema_definitions import beverage_serializer_schema
 
 
 class CategorySerializer(serializers.ModelSerializer):
-    beverages = serializers.HyperlinkedRelatedField(
-        many=True, read_only=True, view_name="v1:beverage-detail"
-    )
+    beverage_count = serializers.SerializerMethodField(read_only=True)
+    beverages_url = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Category
-        fields = ["id", "name", "beverages"]
+        fields = ["id", "name", "beverage_count", "beverages_url"]
+
+    def get_beverage_count(self, obj) -> int:
+        # CategoryViewSet annotates it
+        if hasattr(obj, "beverage_count"):
+            return obj.beverage_count
+        return Beverage.objects.filter(category=obj).count()
+
+    def get_beverages_url(self, obj) -> str:
+        url = reverse("v1:beverage-list", request=self.context.get("request"))
+        return f"{url}?{urlencode({'category': obj.id})}"
+
+    def to_representation(self, instance):
+        """Add the first beverages of the category with ?expand=beverages"""
+        ret = super().to_representation(instance)
+        expanded = self.context.get("expanded_beverages")
+        if expanded is not None:
+            ret["beverages"] = expanded.get(instance.id, [])
+        return ret
 
 
 @beverage_serializer_schema
@@ -34,7 +56,7 @@ class BeverageSerializer(serializers.ModelSerializer):
         """Modify the output of the GET method to show names instead of IDs."""
         ret = super().to_representation(instance)
         ret["category"] = instance.category.name if instance.category else None
-        ret["category_id"] = instance.category.id
+        ret["category_id"] = instance.category_id
         ret["establishment"] = (
             instance.establishment.name if instance.establishment else None
         )
@@ -57,3 +79,61 @@ class BeverageSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("The price must be between 50 and 999.")
         return value
 
+
+def get_beverage_values(queryset, *fields):
+    """
+    values() of a beverage queryset with the columns BeverageSerializer
+    reads plus fields, related names included, so rows need no further queries
+    """
+    return queryset.values(
+        *fields,
+        "id",
+        "name",
+        "price",
+        "description",
+        "availability_status",
+        "category_id",
+        establishment_name=F("establishment__name"),
+        category_name=F("category__name"),
+    )
+
+
+def represent_beverage_values(rows):
+    """
+    BeverageSerializer output of get_beverage_values rows, same keys,
+    order and price formatting, without model instances
+    """
+    price = BeverageSerializer().fields["price"]
+    return [
+        {
+            "id": row["id"],
+            "name": row["name"],
+            "price": price.to_representation(row["price"]),
+            "description": row["description"],
+            "availability_status": row["availability_status"],
+            "establishment": row["establishment_name"],
+            "category": row["category_name"],
+            "category_id": row["category_id"],
+        }
+        for row in rows
+    ]
+
+
+def get_category_beverages(category_ids, limit):
+    """
+    {category_id: represented beverages} with the first limit beverages by
+    name of every category, one query with a ROW_NUMBER() window
+    """
+    queryset = (
+        Beverage.objects.filter(category_id__in=category_ids)
+        .annotate(position=Window(
+            RowNumber(), partition_by=[F("category_id")], order_by=[F("name").asc(), F("id").asc()]
+        ))
+        .filter(position__lte=limit)
+        .order_by("category_id", "position")
+    )
+    rows = list(get_beverage_values(queryset))
+    beverages = {}
+    for row, beverage in zip(rows, represent_beverage_values(rows)):
+        beverages.setdefault(row["category_id"], []).append(beverage)
+    return beverages
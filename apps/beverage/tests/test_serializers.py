@@ -7,7 +7,8 @@ from happyhours.factories import (
     CategoryFactory,
     UserFactory,
 )
-from ..serializers import BeverageSerializer
+from ..models import Beverage
+from ..serializers import BeverageSerializer, get_beverage_values, represent_beverage_values
 from django.test import RequestFactory
 
 User = get_user_model()
@@ -80,3 +81,14 @@ def test_to_representation(beverage):
     result = serializer.to_representation(beverage)
     assert result["category"] == beverage.category.name
     assert result["establishment"] == beverage.establishment.name
+
+
+@pytest.mark.django_db
+def test_beverage_values_match_serializer(beverage, django_assert_num_queries):
+    BeverageFactory(price="50.50")
+    queryset = Beverage.objects.select_related("category", "establishment")
+    expected = [dict(data) for data in BeverageSerializer(queryset, many=True).data]
+    with django_assert_num_queries(1):
+        values = represent_beverage_values(get_beverage_values(Beverage.objects.all()))
+    assert values == expected
+    assert [list(row) for row in values] == [list(row) for row in expected]
@@ -143,3 +143,47 @@ def test_filter_beverage_not_in_happy_hour(
     response = client.get(url)
     assert response.status_code == status.HTTP_200_OK
     assert len(response.data) == 0, "Should find no beverages in happy hour"
+
+
+@pytest.mark.django_db
+def test_search_beverage_by_category_and_establishment(client, normal_user, beverage):
+    client.force_authenticate(user=normal_user)
+    url = reverse("v1:beverage-list")
+    terms = f"{beverage.category.name} {beverage.establishment.name}"
+    response = client.get(url, {"search": terms})
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.data] == [beverage.id]
+
+
+@pytest.mark.django_db
+def test_list_categories_with_counts_and_links(client, normal_user, django_assert_num_queries):
+    category = CategoryFactory()
+    BeverageFactory.create_batch(3, category=category)
+    BeverageFactory()
+    client.force_authenticate(user=normal_user)
+    with django_assert_num_queries(1):
+        response = client.get(reverse("v1:category-list"))
+    assert response.status_code == status.HTTP_200_OK
+    data = {item["id"]: item for item in response.data}[category.id]
+    assert data["beverage_count"] == 3
+    assert "beverages" not in data
+
+    beverages = client.get(data["beverages_url"]).data
+    assert len(beverages) == 3
+    assert {item["category_id"] for item in beverages} == {category.id}
+
+
+@pytest.mark.django_db
+def test_list_categories_expanded(client, normal_user, django_assert_num_queries):
+    category = CategoryFactory()
+    for name in ("Cider", "Ale", "Stout"):
+        BeverageFactory(category=category, name=name)
+    client.force_authenticate(user=normal_user)
+    with django_assert_num_queries(2):
+        response = client.get(reverse("v1:category-list"), {"expand": "beverages", "beverages_limit": 2})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data[0]["beverage_count"] == 3
+    assert [item["name"] for item in response.data[0]["beverages"]] == ["Ale", "Cider"]
+
+    response = client.get(reverse("v1:category-list"), {"expand": "beverages", "beverages_limit": 0})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
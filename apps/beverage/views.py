@@ -1,20 +1,38 @@
+from django.db.models import Count, Q
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import viewsets, permissions
-from rest_framework.filters import SearchFilter
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 
 from happyhours.permissions import IsPartnerOwner, IsAdmin, IsPartnerUser
+from happyhours.search import SearchVectorFilter
 from .filters import BeverageFilter
 from .models import Category, Beverage
-from .serializers import CategorySerializer, BeverageSerializer
+from .schema_definitions import category_expand_parameters
+from .serializers import (
+    CategorySerializer,
+    BeverageSerializer,
+    get_beverage_values,
+    get_category_beverages,
+    represent_beverage_values,
+)
+
+
+DEFAULT_EXPAND_LIMIT = 5
+MAX_EXPAND_LIMIT = 50
 
 
 @extend_schema(tags=["Categories"])
+@extend_schema_view(
+    list=extend_schema(parameters=category_expand_parameters),
+    retrieve=extend_schema(parameters=category_expand_parameters),
+)
 class CategoryViewSet(viewsets.ModelViewSet):
     """
     Provides a set of CRUD operations for categories.
 
-    Each category includes a hyperlink to the associated beverages
+    Each category includes its beverage count and a link to its beverages
 
     ## Endpoints and Permissions
     - **List (GET /categories/)**: Retrieve all categories. Requires authentication.
@@ -28,11 +46,15 @@ class CategoryViewSet(viewsets.ModelViewSet):
      Requires admin privileges.
 
     ## Related Fields
-    - `beverages`: A list of URLs pointing to detailed views of beverages that belong to a category.
-     This field is read-only.
+    - `beverage_count`: Number of visible beverages in the category.
+    - `beverages_url`: The paginated beverage list filtered by the category.
+    - `beverages`: Only with `?expand=beverages`, the first `beverages_limit`
+     (default 5, at most 50) beverages of the category by name.
     """
 
-    queryset = Category.objects.all()
+    queryset = Category.objects.annotate(
+        beverage_count=Count("beverages", filter=Q(beverages__is_visible=True))
+    ).order_by("id")
     serializer_class = CategorySerializer
 
     def get_permissions(self):
@@ -43,6 +65,45 @@ class CategoryViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAdmin]
         return [permission() for permission in permission_classes]
 
+    def get_expand_limit(self):
+        """
+        Beverages per category of ?expand=beverages, None without it.
+        limit belongs to the pagination, so the cap is beverages_limit
+        """
+        params = self.request.query_params
+        if params.get("expand") != "beverages":
+            return None
+        try:
+            limit = int(params.get("beverages_limit", DEFAULT_EXPAND_LIMIT))
+        except ValueError:
+            raise ValidationError("beverages_limit must be an integer.")
+        if not 1 <= limit <= MAX_EXPAND_LIMIT:
+            raise ValidationError(f"beverages_limit must be between 1 and {MAX_EXPAND_LIMIT}.")
+        return limit
+
+    def get_expand_context(self, categories):
+        context = self.get_serializer_context()
+        limit = self.get_expand_limit()
+        if limit is not None:
+            context["expanded_beverages"] = get_category_beverages(
+                [category.id for category in categories], limit
+            )
+        return context
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        categories = list(queryset if page is None else page)
+        serializer = self.get_serializer(categories, many=True, context=self.get_expand_context(categories))
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        category = self.get_object()
+        serializer = self.get_serializer(category, context=self.get_expand_context([category]))
+        return Response(serializer.data)
+
 
 @extend_schema(
     tags=["Beverages"],
@@ -56,13 +117,18 @@ class BeverageViewSet(viewsets.ModelViewSet):
 
     ### Validation:
     - The `price` field must be a non-negative number.
+
+    ### Search:
+    - `search` matches beverage, category and establishment names, ranked and typo tolerant.
+
+    ### Implementation Details:
+    - Lists are read with values(), in BeverageSerializer's shape, without model instances.
     """
 
     queryset = Beverage.objects.all().select_related('category', 'establishment')
     serializer_class = BeverageSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [DjangoFilterBackend, SearchVectorFilter]
     filterset_class = BeverageFilter
-    search_fields = ["name", "category__name", "establishment__name"]
 
     def get_permissions(self):
         permission_classes = {
@@ -74,3 +140,10 @@ class BeverageViewSet(viewsets.ModelViewSet):
             "destroy": [IsPartnerOwner],
         }.get(self.action, [permissions.IsAuthenticated])
         return [permission() for permission in permission_classes]
+
+    def list(self, request, *args, **kwargs):
+        rows = get_beverage_values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(represent_beverage_values(page))
+        return Response(represent_beverage_values(rows))
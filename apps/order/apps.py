@@ -6,4 +6,8 @@ class OrderConfig(AppConfig):
     name = "apps.order"
 
     def ready(self):
+        import apps.order.checks
         import apps.order.signals
+        from apps.order.metrics import install_channel_overflow_handler
+
+        install_channel_overflow_handler()
@@ -0,0 +1,21 @@
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    WebSocket users are cached per token and revoked through the default
+    cache, see apps.order.middleware. A per process cache would keep
+    serving blocked users in every other worker
+    """
+    if isinstance(caches['default'], LocMemCache):
+        return [
+            checks.Warning(
+                "The default cache is not shared between processes.",
+                hint="Point CACHES['default'] at Redis so that revoke_cached_user reaches every worker.",
+                id='order.W001',
+            )
+        ]
+    return []
@@ -1,32 +1,128 @@
+import asyncio
 import json
+from urllib.parse import parse_qs
+
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from rest_framework.exceptions import APIException
 from rest_framework_simplejwt.tokens import AccessToken, TokenError
 import logging
+from . import metrics
+from .events import get_order_event_log, parse_last_seq
 from .models import Order
+from .serializers import IncomingOrderSerializer
+from .transitions import transition_order_status
 
 from ..partner.models import Establishment
 
 logger = logging.getLogger(__name__)
 
+# bounds of the ?batch=<ms> coalescing window
+MIN_BATCH_WINDOW = 50
+MAX_BATCH_WINDOW = 200
+# order_batch frame without orders, the ", " separators come on top
+EMPTY_BATCH_SIZE = len(json.dumps({'type': 'order_batch', 'orders': []}))
+
+
+def get_batch_window(value):
+    """
+    Coalescing window in seconds for the batch query parameter,
+    None when batching is not requested
+    """
+    try:
+        milliseconds = int(value)
+    except (TypeError, ValueError):
+        return None
+    return min(max(milliseconds, MIN_BATCH_WINDOW), MAX_BATCH_WINDOW) / 1000
+
+
+def build_order_frame(event):
+    return {
+        'type': 'order_message',
+        'order_id': event['order_id'],
+        'establishment_id': event['establishment_id'],
+        'status': event['status'],
+        'client': event['client'],
+        'beverage': event['beverage'],
+        'details': event['details'],
+        'seq': event.get('seq'),
+    }
+
+
+class GroupRefreshMixin:
+    """
+    Re-adds the connection to its groups every ORDER_GROUP_REFRESH_INTERVAL
+    seconds. channels_redis drops group members after group_expiry,
+    which long lived tablet sessions outlive
+    """
+
+    refresh_task = None
+
+    def start_group_refresh(self):
+        self.refresh_task = asyncio.create_task(self.refresh_groups())
+
+    def stop_group_refresh(self):
+        if self.refresh_task is not None:
+            self.refresh_task.cancel()
+
+    async def refresh_groups(self):
+        while True:
+            await asyncio.sleep(settings.ORDER_GROUP_REFRESH_INTERVAL)
+            try:
+                for group in self.groups:
+                    await self.channel_layer.group_add(group, self.channel_name)
+            except Exception:
+                logger.warning("Group refresh failed for %s", self.channel_name, exc_info=True)
+
+
+class OrderConsumer(GroupRefreshMixin, AsyncWebsocketConsumer):
+    """
+    Order events of the partner's establishments.
+    On connect every establishment gets either an order_snapshot of its open
+    orders or, when ws/orders/?last_seq=<establishment_id>:<seq>,... is still
+    covered by the replay buffer, the missed order_message events.
+    Events carry a per establishment seq, events already covered by the
+    snapshot or the replay are not sent again.
+    With ?batch=<ms> (clamped to 50-200) order events are collected for that
+    long, updates of the same order collapse into its latest state and the
+    result goes out as one order_batch frame
+    """
 
-class OrderConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         logger.debug("Attempting to connect.")
+        self.groups = []
+        self.seqs = {}
+        query = parse_qs(self.scope['query_string'].decode())
+        self.batch_window = get_batch_window(query.get('batch', [None])[0])
+        self.pending = {}
+        self.pending_events = 0
+        self.flush_task = None
         if self.scope['user'].is_authenticated and self.scope['user'].role == "partner":
             logger.debug(f"WebSocket connection accepted: {self.scope['user']}")
-            self.groups = []
             establishments = await self.get_user_establishments(self.scope['user'])
             for establishment in establishments:
                 group_name = f'order_{establishment.id}'
                 self.groups.append(group_name)
                 await self.channel_layer.group_add(group_name, self.channel_name)
             await self.accept()
+            self.start_group_refresh()
+
+            last_seq = parse_last_seq(query.get('last_seq', [''])[0])
+            frames = await self.get_initial_frames([establishment.id for establishment in establishments], last_seq)
+            for frame in frames:
+                if frame['type'] == 'order_message':
+                    await self.deliver(frame)
+                else:
+                    await self.send_frame(frame)
         else:
             await self.close()
 
     async def disconnect(self, close_code):
+        self.stop_group_refresh()
+        if self.flush_task is not None:
+            self.flush_task.cancel()
         for group in self.groups:
             await self.channel_layer.group_discard(group, self.channel_name)
 
@@ -44,30 +140,104 @@ class OrderConsumer(AsyncWebsocketConsumer):
                 }))
 
     async def order_message(self, event):
+        seq = event.get('seq')
+        if seq is not None and seq <= self.seqs.get(event['establishment_id'], 0):
+            # already part of the snapshot or the replay
+            return
         # Forward order details to the client
-        await self.send(text_data=json.dumps({
-            'type': event['type'],
-            'order_id': event['order_id'],
-            'establishment_id': event['establishment_id'],
-            'status': event['status'],
-            'client': event['client'],
-            'beverage': event['beverage'],
-            'details': event['details']
-        }))
+        await self.deliver(build_order_frame(event))
+
+    async def send_frame(self, frame):
+        text_data = json.dumps(frame)
+        await self.send(text_data=text_data)
+        metrics.increment('ws_frames_sent')
+        metrics.increment('ws_bytes_sent', len(text_data))
+        return len(text_data)
+
+    async def deliver(self, frame):
+        """
+        Sends the order frame right away, or queues it for the next
+        order_batch when batching is on
+        """
+        if self.batch_window is None:
+            await self.send_frame(frame)
+            return
+        if frame['order_id'] in self.pending:
+            metrics.increment('ws_events_coalesced')
+        self.pending[frame['order_id']] = frame
+        self.pending_events += 1
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush_later())
+
+    async def flush_later(self):
+        await asyncio.sleep(self.batch_window)
+        self.flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        if not self.pending:
+            return
+        orders = list(self.pending.values())
+        unbatched_frames = self.pending_events
+        self.pending, self.pending_events = {}, 0
+
+        size = await self.send_frame({'type': 'order_batch', 'orders': orders})
+        # every order is serialized in the batch as it would be alone, the
+        # coalesced ones are assumed to be of the average size
+        order_bytes = (size - EMPTY_BATCH_SIZE - 2 * (len(orders) - 1)) / len(orders)
+        metrics.increment('ws_frames_saved', unbatched_frames - 1)
+        metrics.increment('ws_bytes_saved', round(unbatched_frames * order_bytes) - size)
 
     @database_sync_to_async
     def get_user_establishments(self, user):
         return list(Establishment.objects.filter(owner=user))
 
+    @database_sync_to_async
+    def get_initial_frames(self, establishment_ids, last_seq):
+        """
+        Replayed events for establishments resumed from the buffer and
+        snapshots for the others. The sequence number is read before the
+        open orders, so later events are never hidden by the snapshot
+        """
+        event_log = get_order_event_log()
+        frames = []
+        snapshot_ids = []
+        for establishment_id in establishment_ids:
+            events = None
+            if establishment_id in last_seq:
+                events = event_log.read_since(establishment_id, last_seq[establishment_id])
+            if events is None:
+                snapshot_ids.append(establishment_id)
+                self.seqs[establishment_id] = event_log.current_seq(establishment_id)
+            else:
+                frames.extend(build_order_frame(event) for event in events)
+                self.seqs[establishment_id] = last_seq[establishment_id] + len(events)
+
+        if snapshot_ids:
+            orders = {establishment_id: [] for establishment_id in snapshot_ids}
+            open_orders = Order.objects.filter(
+                establishment_id__in=snapshot_ids,
+                status__in=['pending', 'in_preparation'],
+            ).select_related('client').order_by('order_date', 'id')
+            for order in IncomingOrderSerializer(open_orders, many=True).data:
+                orders[order['establishment']].append(order)
+            frames.extend(
+                {
+                    'type': 'order_snapshot',
+                    'establishment_id': establishment_id,
+                    'seq': self.seqs[establishment_id],
+                    'orders': orders[establishment_id],
+                }
+                for establishment_id in snapshot_ids
+            )
+        return frames
+
     @database_sync_to_async
     def update_order_status(self, order_id, status):
         try:
-            order = Order.objects.select_related('establishment').get(id=order_id,
-                                                                      establishment__owner=self.scope['user'])
-            order.status = status
-            order.save()
+            transition_order_status(order_id, status, self.scope['user'])
             return True
-        except Order.DoesNotExist:
+        except APIException:
             return False
 
     @database_sync_to_async
@@ -79,3 +249,29 @@ class OrderConsumer(AsyncWebsocketConsumer):
             return user
         except TokenError as e:
             return None
+
+
+class ClientOrderConsumer(GroupRefreshMixin, AsyncWebsocketConsumer):
+    """
+    Status changes of the authenticated client's own orders, sent as
+    order_message frames of the same shape as in OrderConsumer
+    """
+
+    async def connect(self):
+        self.groups = []
+        if self.scope['user'].is_authenticated and self.scope['user'].role == "client":
+            group_name = f"client_orders_{self.scope['user'].id}"
+            self.groups.append(group_name)
+            await self.channel_layer.group_add(group_name, self.channel_name)
+            await self.accept()
+            self.start_group_refresh()
+        else:
+            await self.close()
+
+    async def disconnect(self, close_code):
+        self.stop_group_refresh()
+        for group in self.groups:
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def order_message(self, event):
+        await self.send(text_data=json.dumps(build_order_frame(event)))
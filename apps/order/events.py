@@ -0,0 +1,178 @@
+import json
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django.utils.module_loading import import_string
+
+from happyhours.utils import get_redis_connection
+
+DEFAULT_ORDER_EVENT_LOG = {
+    'BACKEND': 'apps.order.events.RedisOrderEventLog',
+    'OPTIONS': {},
+}
+
+
+class BaseOrderEventLog:
+    """
+    Assigns a monotonically increasing sequence number per establishment
+    to every dispatched order event and keeps the last buffer_size events
+    so that reconnecting consumers can replay what they missed
+    """
+
+    def __init__(self, key_prefix='order_events', buffer_size=500, **options):
+        self.key_prefix = key_prefix
+        self.buffer_size = buffer_size
+
+    def seq_key(self, establishment_id):
+        return f'{self.key_prefix}:seq:{establishment_id}'
+
+    def buffer_key(self, establishment_id):
+        return f'{self.key_prefix}:buffer:{establishment_id}'
+
+    def append(self, establishment_id, message):
+        """
+        Stores message and returns its sequence number
+        """
+        raise NotImplementedError
+
+    def current_seq(self, establishment_id):
+        raise NotImplementedError
+
+    def read_since(self, establishment_id, seq):
+        """
+        Events after seq, each with its 'seq'. Returns None when some of them
+        already left the buffer or seq is unknown, then a snapshot is needed
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class RedisOrderEventLog(BaseOrderEventLog):
+    """
+    Event log stored in the Redis instance used by the channel layer.
+    The counter is a plain key, the buffer a sorted set scored by sequence
+    number whose members are "<seq>:<json message>"
+    """
+
+    append_script = """
+        local seq = redis.call('INCR', KEYS[1])
+        redis.call('ZADD', KEYS[2], seq, seq .. ':' .. ARGV[1])
+        redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -tonumber(ARGV[2]) - 1)
+        return seq
+    """
+
+    def __init__(self, key_prefix='order_events', buffer_size=500, **options):
+        super().__init__(key_prefix=key_prefix, buffer_size=buffer_size, **options)
+        self.redis = get_redis_connection()
+        self._append = self.redis.register_script(self.append_script)
+
+    def append(self, establishment_id, message):
+        return self._append(
+            keys=[self.seq_key(establishment_id), self.buffer_key(establishment_id)],
+            args=[json.dumps(message), self.buffer_size],
+        )
+
+    def current_seq(self, establishment_id):
+        return int(self.redis.get(self.seq_key(establishment_id)) or 0)
+
+    def read_since(self, establishment_id, seq):
+        with self.redis.pipeline(transaction=True) as pipe:
+            pipe.get(self.seq_key(establishment_id))
+            pipe.zrangebyscore(self.buffer_key(establishment_id), f'({seq}', '+inf')
+            current, members = pipe.execute()
+        current = int(current or 0)
+        if seq > current:
+            return None
+        events = []
+        for member in members:
+            member_seq, message = member.decode().split(':', 1)
+            events.append({**json.loads(message), 'seq': int(member_seq)})
+        if len(events) != current - seq:
+            return None
+        return events
+
+    def clear(self):
+        keys = list(self.redis.scan_iter(match=f'{self.key_prefix}:*', count=1000))
+        if keys:
+            self.redis.delete(*keys)
+
+
+class LocMemOrderEventLog(BaseOrderEventLog):
+    """
+    In process event log, intended for tests and single process development
+    """
+
+    def __init__(self, key_prefix='order_events', buffer_size=500, **options):
+        super().__init__(key_prefix=key_prefix, buffer_size=buffer_size, **options)
+        self._seqs = {}
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def append(self, establishment_id, message):
+        with self._lock:
+            seq = self._seqs.get(establishment_id, 0) + 1
+            self._seqs[establishment_id] = seq
+            buffer = self._buffers.setdefault(establishment_id, deque(maxlen=self.buffer_size))
+            buffer.append({**message, 'seq': seq})
+            return seq
+
+    def current_seq(self, establishment_id):
+        with self._lock:
+            return self._seqs.get(establishment_id, 0)
+
+    def read_since(self, establishment_id, seq):
+        with self._lock:
+            current = self._seqs.get(establishment_id, 0)
+            if seq > current:
+                return None
+            events = [event for event in self._buffers.get(establishment_id, ()) if event['seq'] > seq]
+        if len(events) != current - seq:
+            return None
+        return events
+
+    def clear(self):
+        with self._lock:
+            self._seqs.clear()
+            self._buffers.clear()
+
+
+_event_log = None
+
+
+def get_order_event_log():
+    """
+    Returns the event log configured by settings.ORDER_EVENT_LOG
+    """
+    global _event_log
+    if _event_log is None:
+        config = getattr(settings, 'ORDER_EVENT_LOG', DEFAULT_ORDER_EVENT_LOG)
+        backend = import_string(config['BACKEND'])
+        _event_log = backend(**config.get('OPTIONS', {}))
+    return _event_log
+
+
+@receiver(setting_changed)
+def reset_order_event_log(setting, **kwargs):
+    global _event_log
+    if setting == 'ORDER_EVENT_LOG':
+        _event_log = None
+
+
+def parse_last_seq(value):
+    """
+    Parses the last_seq query parameter, "<establishment_id>:<seq>,...".
+    Malformed parts are skipped, their establishments get a snapshot
+    """
+    last_seq = {}
+    for part in (value or '').split(','):
+        establishment_id, _, seq = part.partition(':')
+        try:
+            last_seq[int(establishment_id)] = int(seq)
+        except ValueError:
+            continue
+    return last_seq
@@ -0,0 +1,102 @@
+import csv
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_FIELDS = {
+    'id': 'id',
+    'order_date': 'order_date',
+    'status': 'status',
+    'beverage': 'beverage_name',
+    'category': 'category_name',
+    'price': 'price',
+    'client': 'client__name',
+    'client_email': 'client__email',
+}
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+CHUNK_SIZE = 2000
+WRITE_BUFFER_SIZE = 64 * 1024
+# leading characters that make spreadsheet applications evaluate a cell
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Echo:
+    """
+    File like object for csv.writer that returns the written line
+    """
+
+    def write(self, value):
+        return value
+
+
+def get_export_rows(queryset):
+    """
+    Order rows read through a server side cursor, CHUNK_SIZE rows at a time
+    """
+    return queryset.values_list(*EXPORT_FIELDS.values()).iterator(chunk_size=CHUNK_SIZE)
+
+
+def escape_csv_cell(value):
+    """
+    Quotes text cells a spreadsheet would read as a formula, names and
+    emails are entered by clients
+    """
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS.keys())
+    for row in rows:
+        yield writer.writerow([escape_csv_cell(value) for value in row])
+
+
+def iter_ndjson(rows):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(EXPORT_FIELDS, row))) + '\n'
+
+
+def iter_buffered(lines):
+    """
+    Joins lines into chunks of about WRITE_BUFFER_SIZE characters
+    """
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= WRITE_BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+async def aiter_chunks(chunks):
+    """
+    Async wrapper for ASGI. Every chunk is read in the request's thread,
+    where the server side cursor lives
+    """
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while True:
+        chunk = await next_chunk(chunks, None)
+        if chunk is None:
+            break
+        yield chunk
+
+
+def stream_orders(queryset, export_format, asynchronous=False):
+    """
+    Streaming content of the queryset's orders in export_format.
+    Memory use does not depend on the number of orders
+    """
+    lines = iter_csv if export_format == 'csv' else iter_ndjson
+    chunks = iter_buffered(lines(get_export_rows(queryset)))
+    if asynchronous:
+        return aiter_chunks(chunks)
+    return chunks
@@ -0,0 +1,262 @@
+import datetime
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from happyhours.utils import get_redis_connection
+
+DEFAULT_ORDER_LEDGER = {
+    'BACKEND': 'apps.order.ledger.RedisOrderLedger',
+    'OPTIONS': {},
+}
+
+
+def get_window_expiries(order_date):
+    """
+    Unix timestamps at which the per hour and per day windows
+    of an order placed at order_date are closed
+    """
+    order_date = timezone.localtime(order_date)
+    hour_expiry = order_date + datetime.timedelta(hours=1)
+    day_expiry = datetime.datetime.combine(
+        order_date.date() + datetime.timedelta(days=1), datetime.time.min, tzinfo=order_date.tzinfo
+    )
+    return int(hour_expiry.timestamp()), int(day_expiry.timestamp())
+
+
+class BaseOrderLedger:
+    """
+    Keeps per client (one order per hour) and per client per establishment
+    (one order per day) windows of non cancelled orders so that placement
+    does not have to scan the Order table
+    """
+
+    def __init__(self, key_prefix='order_ledger', **options):
+        self.key_prefix = key_prefix
+
+    def hour_key(self, client_id):
+        return f'{self.key_prefix}:hour:{client_id}'
+
+    def day_key(self, client_id, establishment_id):
+        return f'{self.key_prefix}:day:{client_id}:{establishment_id}'
+
+    def lookup(self, client_id, establishment_id):
+        """
+        Returns (has_order_last_hour, has_order_today) in one round trip
+        """
+        raise NotImplementedError
+
+    def has_order_last_hour(self, client_id):
+        raise NotImplementedError
+
+    def has_order_today(self, client_id, establishment_id):
+        raise NotImplementedError
+
+    def record(self, order):
+        """
+        Open both windows for a created order
+        """
+        raise NotImplementedError
+
+    def release(self, order):
+        """
+        Close the windows opened by order, e.g. when it gets cancelled
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def replace_with(self, staging):
+        """
+        Atomically make the windows of the staging ledger the content
+        of this one, staging is left empty
+        """
+        raise NotImplementedError
+
+    def rebuild(self, orders):
+        """
+        Replace the ledger content with the given orders. The windows are
+        recorded under temporary keys and swapped in at once, so checks
+        never read a partially rebuilt ledger
+        """
+        staging = type(self)(key_prefix=f'{self.key_prefix}_rebuild_{uuid.uuid4().hex}')
+        count = 0
+        for order in orders:
+            staging.record(order)
+            count += 1
+        self.replace_with(staging)
+        return count
+
+
+class RedisOrderLedger(BaseOrderLedger):
+    """
+    Ledger stored in the Redis instance used by the channel layer.
+    Windows are plain keys holding the order id and expiring with the window
+    """
+
+    release_script = """
+        local released = 0
+        for _, key in ipairs(KEYS) do
+            if redis.call('GET', key) == ARGV[1] then
+                redis.call('DEL', key)
+                released = released + 1
+            end
+        end
+        return released
+    """
+
+    def __init__(self, key_prefix='order_ledger', **options):
+        super().__init__(key_prefix=key_prefix, **options)
+        self.redis = get_redis_connection()
+        self._release = self.redis.register_script(self.release_script)
+
+    def lookup(self, client_id, establishment_id):
+        hour, day = self.redis.mget(
+            self.hour_key(client_id), self.day_key(client_id, establishment_id)
+        )
+        return hour is not None, day is not None
+
+    def has_order_last_hour(self, client_id):
+        return bool(self.redis.exists(self.hour_key(client_id)))
+
+    def has_order_today(self, client_id, establishment_id):
+        return bool(self.redis.exists(self.day_key(client_id, establishment_id)))
+
+    def record(self, order):
+        hour_expiry, day_expiry = get_window_expiries(order.order_date)
+        with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(self.hour_key(order.client_id), order.id, exat=hour_expiry)
+            pipe.set(self.day_key(order.client_id, order.establishment_id), order.id, exat=day_expiry)
+            pipe.execute()
+
+    def release(self, order):
+        self._release(
+            keys=[self.hour_key(order.client_id), self.day_key(order.client_id, order.establishment_id)],
+            args=[order.id],
+        )
+
+    def clear(self):
+        keys = list(self.redis.scan_iter(match=f'{self.key_prefix}:*', count=1000))
+        if keys:
+            self.redis.delete(*keys)
+
+    def replace_with(self, staging):
+        prefix, staging_prefix = self.key_prefix.encode(), staging.key_prefix.encode()
+        staged = list(self.redis.scan_iter(match=f'{staging.key_prefix}:*', count=1000))
+        targets = {key: prefix + key[len(staging_prefix):] for key in staged}
+        stale = set(self.redis.scan_iter(match=f'{self.key_prefix}:*', count=1000)) - set(targets.values())
+        # RENAME keeps the expiry of the staged window, a window that expired
+        # since the scan fails alone and does not abort the others
+        with self.redis.pipeline(transaction=True) as pipe:
+            if stale:
+                pipe.delete(*stale)
+            for key, target in targets.items():
+                pipe.rename(key, target)
+            pipe.execute(raise_on_error=False)
+
+
+class LocMemOrderLedger(BaseOrderLedger):
+    """
+    In process ledger, intended for tests and single process development
+    """
+
+    def __init__(self, key_prefix='order_ledger', **options):
+        super().__init__(key_prefix=key_prefix, **options)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.time():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def lookup(self, client_id, establishment_id):
+        with self._lock:
+            return (
+                self._get(self.hour_key(client_id)) is not None,
+                self._get(self.day_key(client_id, establishment_id)) is not None,
+            )
+
+    def has_order_last_hour(self, client_id):
+        return self.lookup(client_id, None)[0]
+
+    def has_order_today(self, client_id, establishment_id):
+        return self.lookup(client_id, establishment_id)[1]
+
+    def record(self, order):
+        hour_expiry, day_expiry = get_window_expiries(order.order_date)
+        with self._lock:
+            self._entries[self.hour_key(order.client_id)] = (order.id, hour_expiry)
+            self._entries[self.day_key(order.client_id, order.establishment_id)] = (order.id, day_expiry)
+
+    def release(self, order):
+        keys = [self.hour_key(order.client_id), self.day_key(order.client_id, order.establishment_id)]
+        with self._lock:
+            for key in keys:
+                if self._get(key) == order.id:
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def replace_with(self, staging):
+        prefix_length = len(staging.key_prefix)
+        with staging._lock:
+            entries = {
+                self.key_prefix + key[prefix_length:]: entry for key, entry in staging._entries.items()
+            }
+            staging._entries = {}
+        with self._lock:
+            self._entries = entries
+
+
+def record_order_on_commit(order):
+    """
+    Opens the windows of a created order once the current transaction
+    commits, a rolled back placement leaves the ledger untouched
+    """
+    transaction.on_commit(lambda: get_order_ledger().record(order))
+
+
+def release_order_on_commit(order):
+    """
+    Closes the windows of a cancelled or deleted order once the current
+    transaction commits
+    """
+    transaction.on_commit(lambda: get_order_ledger().release(order))
+
+
+_ledger = None
+
+
+def get_order_ledger():
+    """
+    Returns the ledger configured by settings.ORDER_LEDGER
+    """
+    global _ledger
+    if _ledger is None:
+        config = getattr(settings, 'ORDER_LEDGER', DEFAULT_ORDER_LEDGER)
+        backend = import_string(config['BACKEND'])
+        _ledger = backend(**config.get('OPTIONS', {}))
+    return _ledger
+
+
+@receiver(setting_changed)
+def reset_order_ledger(setting, **kwargs):
+    global _ledger
+    if setting == 'ORDER_LEDGER':
+        _ledger = None
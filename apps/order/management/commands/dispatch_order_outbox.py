@@ -0,0 +1,47 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.order.outbox import dispatch_order_outbox, purge_order_outbox
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Send pending order notifications from the outbox to the channel layer"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--interval", type=float, default=0.2,
+                            help="Seconds to wait when the outbox is empty")
+        parser.add_argument("--retention", type=int, default=3600,
+                            help="Seconds to keep dispatched events")
+        parser.add_argument("--max-backoff", type=float, default=30,
+                            help="Longest wait in seconds between retries of a failing batch")
+        parser.add_argument("--once", action="store_true", help="Drain the outbox and exit")
+
+    def handle(self, *args, **options):
+        retention = timedelta(seconds=options["retention"])
+        last_purge = 0
+        backoff = options["interval"]
+        while True:
+            close_old_connections()
+            try:
+                dispatched = dispatch_order_outbox(options["batch_size"])
+            except Exception:
+                # the batch stays pending, e.g. while Redis is unreachable
+                logger.exception("Order outbox dispatch failed, retrying in %.1fs", backoff)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, options["max_backoff"])
+                continue
+            backoff = options["interval"]
+            if time.monotonic() - last_purge > retention.total_seconds():
+                purge_order_outbox(retention)
+                last_purge = time.monotonic()
+            if options["once"] and not dispatched:
+                return
+            if not dispatched:
+                time.sleep(options["interval"])
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from apps.order.ledger import get_order_ledger
+from apps.order.utils import get_ledger_orders
+
+
+class Command(BaseCommand):
+    help = "Rebuild the order quota ledger from the Order table"
+
+    def handle(self, *args, **options):
+        count = get_order_ledger().rebuild(get_ledger_orders().iterator())
+        self.stdout.write(self.style.SUCCESS(f"Order ledger rebuilt from {count} orders"))
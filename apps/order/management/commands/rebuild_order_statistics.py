@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.order.statistics import rebuild_order_statistics
+
+
+class Command(BaseCommand):
+    help = "Backfill the daily order statistics rollup from the Order table"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = rebuild_order_statistics()
+        self.stdout.write(self.style.SUCCESS(f"Order statistics rebuilt, {count} rollup rows"))
@@ -0,0 +1,17 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from apps.order.metrics import get_counters, reset_counters
+
+
+class Command(BaseCommand):
+    help = "Print the channel layer and WebSocket counters of all processes as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after printing them")
+
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps(get_counters(), sort_keys=True))
+        if options["reset"]:
+            reset_counters()
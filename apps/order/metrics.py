@@ -0,0 +1,107 @@
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+METRIC_NAMES = (
+    'channel_layer_group_sends',
+    'channel_layer_over_capacity',
+    'channel_layer_over_capacity_sends',
+    'ws_frames_sent',
+    'ws_bytes_sent',
+    'ws_events_coalesced',
+    'ws_frames_saved',
+    'ws_bytes_saved',
+)
+# seconds between flushes of the in process counts to the shared cache
+FLUSH_INTERVAL = 10
+
+# counts of this process not flushed yet
+_counters = Counter()
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def get_metric_key(name):
+    return f'order_metrics:{name}'
+
+
+def increment(name, value=1):
+    """
+    Adds value to the counter name. Counts are kept in process and added
+    to the shared cache at most every FLUSH_INTERVAL seconds
+    """
+    with _lock:
+        _counters[name] += value
+        due = time.monotonic() - _last_flush >= FLUSH_INTERVAL
+    if due:
+        flush_counters()
+
+
+def flush_counters():
+    """
+    Adds the counts of this process to the totals of all processes in the
+    default cache. Counts that fail to reach it are kept for the next flush
+    """
+    global _last_flush
+    with _lock:
+        pending = dict(_counters)
+        _counters.clear()
+        _last_flush = time.monotonic()
+    try:
+        for name, value in pending.items():
+            key = get_metric_key(name)
+            cache.add(key, 0, timeout=None)
+            cache.incr(key, value)
+    except Exception:
+        logger.warning("Could not flush order metrics", exc_info=True)
+        with _lock:
+            _counters.update(pending)
+
+
+def get_counters():
+    """
+    Totals of all processes, including the unflushed counts of this one
+    """
+    totals = cache.get_many([get_metric_key(name) for name in METRIC_NAMES])
+    with _lock:
+        return {
+            name: totals.get(get_metric_key(name), 0) + _counters[name]
+            for name in METRIC_NAMES
+        }
+
+
+def reset_counters():
+    with _lock:
+        _counters.clear()
+    cache.delete_many([get_metric_key(name) for name in METRIC_NAMES])
+
+
+class ChannelOverflowHandler(logging.Handler):
+    """
+    channels_redis skips group members whose channel is over capacity and
+    only reports it as an info record, this handler counts them.
+    Only RedisChannelLayer (CHANNEL_LAYER_TYPE=core) logs these records,
+    with CHANNEL_LAYER_TYPE=pubsub the handler never fires
+    """
+
+    message = '%s of %s channels over capacity in group %s'
+
+    def emit(self, record):
+        if record.msg == self.message:
+            increment('channel_layer_over_capacity', record.args[0])
+            increment('channel_layer_over_capacity_sends')
+
+
+def install_channel_overflow_handler():
+    """
+    Attaches the handler once. The logger only emits the records at INFO,
+    which settings.LOGGING configures
+    """
+    channel_logger = logging.getLogger('channels_redis.core')
+    if not any(isinstance(handler, ChannelOverflowHandler) for handler in channel_logger.handlers):
+        channel_logger.addHandler(ChannelOverflowHandler())
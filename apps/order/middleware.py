@@ -1,42 +1,94 @@
+import time
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
 from channels.db import database_sync_to_async
-from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-from rest_framework_simplejwt.tokens import UntypedToken
 from channels.middleware import BaseMiddleware
-from channels.auth import AuthMiddlewareStack
-from django.db import close_old_connections
-from urllib.parse import parse_qs
-from jwt import decode as jwt_decode
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+# what consumers read from scope['user'], other fields load on access
+CACHED_USER_FIELDS = ('id', 'email', 'role', 'is_active', 'is_blocked')
+
+
+def get_user_cache_key(user_id, jti):
+    return f'ws_auth:{user_id}:{jti}'
+
+
+def get_revocation_cache_key(user_id):
+    return f'ws_auth_revoked:{user_id}'
+
+
+def revoke_cached_user(user_id):
+    """
+    Stops serving cached users for user_id. The marker lives as long as
+    the cache entries, so every entry written before it is expired by then
+    """
+    cache.set(get_revocation_cache_key(user_id), True, settings.WS_AUTH_CACHE_TTL)
 
 
 @database_sync_to_async
-def get_user(validated_token):
-    user = get_user_model().objects.get(id=validated_token["user_id"])
+def get_user(user_id, jti, expires_at):
+    """
+    User of a verified token. The cache holds CACHED_USER_FIELDS rather
+    than the pickled instance, a hit is rebuilt as a user with the other
+    fields deferred
+    """
+    User = get_user_model()
+    user_key = get_user_cache_key(user_id, jti)
+    revocation_key = get_revocation_cache_key(user_id)
+    cached = cache.get_many([user_key, revocation_key])
+    if revocation_key not in cached and user_key in cached:
+        values = cached[user_key]
+        return User.from_db(None, CACHED_USER_FIELDS, [values[name] for name in CACHED_USER_FIELDS])
+
+    try:
+        user = User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+    except User.DoesNotExist:
+        return None
+    if not user.is_active or user.is_blocked:
+        return None
+
+    timeout = min(settings.WS_AUTH_CACHE_TTL, int(expires_at - time.time()))
+    if revocation_key not in cached and timeout > 0:
+        cache.set(user_key, {name: getattr(user, name) for name in CACHED_USER_FIELDS}, timeout)
     return user
 
 
 class JwtAuthMiddleware(BaseMiddleware):
+    """
+    Authenticates WebSocket connections with ?token=<access token>.
+    The token is verified once, the user is cached per token for
+    WS_AUTH_CACHE_TTL seconds. Missing, invalid or expired tokens and
+    blocked users get an AnonymousUser, consumers reject those
+    """
+
     def __init__(self, inner):
         self.inner = inner
 
     async def __call__(self, scope, receive, send):
-        close_old_connections()
-
-        token = parse_qs(scope["query_string"].decode("utf8"))["token"][0]
+        scope['user'] = await self.authenticate(scope)
+        return await super().__call__(scope, receive, send)
 
+    async def authenticate(self, scope):
+        token = parse_qs(scope["query_string"].decode("utf8")).get("token")
+        if not token:
+            return AnonymousUser()
         try:
-            UntypedToken(token)
-        except (InvalidToken, TokenError) as e:
-            print(e)
-            return None
-        else:
-            decoded_data = jwt_decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-            print(decoded_data)
-
-            # Get the user using ID
-            scope["user"] = await get_user(validated_token=decoded_data)
-        return await super().__call__(scope, receive, send)
+            access_token = AccessToken(token[0])
+        except TokenError:
+            return AnonymousUser()
+
+        user_id = access_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return AnonymousUser()
+        user = await get_user(user_id, access_token.get(api_settings.JTI_CLAIM), access_token['exp'])
+        return user or AnonymousUser()
 
 
 def JwtAuthMiddlewareStack(inner):
@@ -0,0 +1,51 @@
+# Generated by Django 4.2 on 2026-10-18 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("partner", "0011_establishment_partner_est_name_ab12cf_idx_and_more"),
+        ("order", "0004_orderoutbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderDailyStatistic",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("category_name", models.CharField(max_length=100)),
+                ("order_count", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "establishment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="order_statistics",
+                        to="partner.establishment",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="orderdailystatistic",
+            constraint=models.UniqueConstraint(
+                fields=("establishment", "day", "category_name"),
+                name="order_daily_statistic_unique",
+            ),
+        ),
+    ]
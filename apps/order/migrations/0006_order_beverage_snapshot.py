@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("beverage", "0013_beverage_beverage_be_name_57c27e_idx_and_more"),
+        ("order", "0005_orderdailystatistic"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="beverage_name",
+            field=models.CharField(blank=True, default="", max_length=100),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="category_name",
+            field=models.CharField(blank=True, default="", max_length=100),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="price",
+            field=models.DecimalField(decimal_places=2, max_digits=5, null=True),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE order_order AS o
+                SET beverage_name = b.name, category_name = c.name, price = b.price
+                FROM beverage_beverage AS b
+                JOIN beverage_category AS c ON c.id = b.category_id
+                WHERE b.id = o.beverage_id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("order", "0006_order_beverage_snapshot"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="order",
+            name="price",
+            field=models.DecimalField(decimal_places=2, max_digits=5),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("order", "0007_alter_order_price"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["client", "-order_date", "-id"], name="order_client_keyset_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["establishment", "-order_date", "-id"], name="order_est_keyset_idx"
+            ),
+        ),
+    ]
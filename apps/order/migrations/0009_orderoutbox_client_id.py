@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("order", "0008_order_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orderoutbox",
+            name="client_id",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("order", "0009_orderoutbox_client_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orderoutbox",
+            name="seq",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
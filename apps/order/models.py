@@ -1,5 +1,5 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 
 from apps.beverage.models import Beverage
 from apps.partner.models import Establishment
@@ -15,6 +15,11 @@ class Order(models.Model):
         ('completed', 'Completed'),
         ('cancelled', 'Cancelled'),
     ]
+    # pending -> in_preparation -> completed, cancelled from any open state
+    TRANSITIONS = {
+        'pending': ('in_preparation', 'cancelled'),
+        'in_preparation': ('completed', 'cancelled'),
+    }
     establishment = models.ForeignKey(
         Establishment, on_delete=models.CASCADE, related_name="orders"
     )
@@ -24,13 +29,88 @@ class Order(models.Model):
     client = models.ForeignKey(User, on_delete=models.CASCADE, related_name="orders")
     order_date = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    # Beverage snapshot taken at placement time
+    beverage_name = models.CharField(max_length=100, blank=True)
+    category_name = models.CharField(max_length=100, blank=True)
+    price = models.DecimalField(max_digits=5, decimal_places=2)
 
     class Meta:
         indexes = [
             models.Index(fields=['client']),
             models.Index(fields=['order_date']),
+            # Keyset pagination of order history on (order_date, id)
+            models.Index(fields=['client', '-order_date', '-id'], name='order_client_keyset_idx'),
+            models.Index(fields=['establishment', '-order_date', '-id'], name='order_est_keyset_idx'),
         ]
         ordering = ['-order_date']
 
     def __str__(self):
         return f"Order by {self.client} at {self.establishment}"
+
+    @classmethod
+    def get_allowed_predecessors(cls, status):
+        return [source for source, targets in cls.TRANSITIONS.items() if status in targets]
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.price is None:
+            self.beverage_name = self.beverage.name
+            self.category_name = self.beverage.category.name
+            self.price = self.beverage.price
+        # Keeps the outbox row written by post_save in the order's transaction
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class OrderOutbox(models.Model):
+    """
+    Order notifications waiting to be sent to the channel layer.
+    Rows are written in the same transaction as the order change and
+    drained by the dispatch_order_outbox command
+    """
+
+    group_name = models.CharField(max_length=255)
+    # the ordering client also gets the event in its client_orders_<id> group
+    client_id = models.BigIntegerField(null=True, blank=True)
+    payload = models.JSONField()
+    # establishment sequence number, assigned on the first dispatch attempt
+    seq = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['id'],
+                name='order_outbox_pending_idx',
+                condition=models.Q(dispatched_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"Outbox {self.id} for {self.group_name}"
+
+
+class OrderDailyStatistic(models.Model):
+    """
+    Daily rollup of orders of every status per establishment and category,
+    maintained incrementally as orders are created and deleted
+    """
+
+    establishment = models.ForeignKey(
+        Establishment, on_delete=models.CASCADE, related_name="order_statistics"
+    )
+    day = models.DateField()
+    category_name = models.CharField(max_length=100)
+    order_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['establishment', 'day', 'category_name'],
+                name='order_daily_statistic_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.establishment_id} {self.day} {self.category_name}: {self.order_count}"
@@ -0,0 +1,122 @@
+import asyncio
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.utils import timezone
+
+from . import metrics
+from .events import get_order_event_log
+from .models import Order, OrderOutbox
+
+
+def get_client_name(order):
+    """
+    Client name of the order, read from the loaded relation when possible
+    and with a single query otherwise
+    """
+    if Order.client.is_cached(order):
+        return order.client.name
+    return Order.objects.filter(pk=order.pk).values_list('client__name', flat=True).get()
+
+
+def build_order_message(order, details, client_name):
+    return {
+        "type": "order_message",
+        "order_id": order.id,
+        "establishment_id": order.establishment_id,
+        "status": order.status,
+        "client": client_name,
+        "beverage": order.beverage_name,
+        "details": details,
+    }
+
+
+def enqueue_order_notification(order, created, client_name=None):
+    """
+    Write the order notification to the outbox in the current transaction
+    """
+    if client_name is None:
+        client_name = get_client_name(order)
+    details = f"New order created: {order.id}" if created else f"Order updated: {order.id}"
+    return OrderOutbox.objects.create(
+        group_name=f'order_{order.establishment_id}',
+        client_id=order.client_id,
+        payload=build_order_message(order, details, client_name),
+    )
+
+
+def assign_event_sequences(events):
+    """
+    Stamps every event with a sequence number of its establishment. Events
+    without one get the next number, are stored in the replay buffer and
+    keep the number on their row, so a retried event is neither renumbered
+    nor buffered twice
+    """
+    event_log = get_order_event_log()
+    numbered = []
+    for event in events:
+        if event.seq is None:
+            event.seq = event_log.append(event.payload['establishment_id'], event.payload)
+            numbered.append(event)
+        event.payload = {**event.payload, 'seq': event.seq}
+    OrderOutbox.objects.bulk_update(numbered, ['seq'])
+
+
+async def send_outbox_events(events):
+    """
+    Sends events to the channel layer, to the establishment's group and the
+    client's group. Events of one group keep their order, different groups
+    are sent concurrently
+    """
+    channel_layer = get_channel_layer()
+    groups = {}
+    for event in events:
+        groups.setdefault(event.group_name, []).append(event.payload)
+        if event.client_id is not None:
+            groups.setdefault(f'client_orders_{event.client_id}', []).append(event.payload)
+
+    async def send_group(group_name, messages):
+        for message in messages:
+            await channel_layer.group_send(group_name, message)
+            metrics.increment('channel_layer_group_sends')
+
+    await asyncio.gather(*(send_group(name, messages) for name, messages in groups.items()))
+
+
+def dispatch_order_outbox(batch_size=100):
+    """
+    Send one batch of pending outbox events and mark them dispatched.
+    A failed send leaves the batch pending with its sequence numbers, so
+    delivery is at least once and a retry sends the same numbers.
+    Returns the number of dispatched events
+    """
+    error = None
+    with transaction.atomic():
+        events = list(
+            OrderOutbox.objects.select_for_update(skip_locked=True)
+            .filter(dispatched_at__isnull=True)
+            .order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0
+        assign_event_sequences(events)
+        try:
+            async_to_sync(send_outbox_events)(events)
+        except Exception as exc:
+            # commit the sequence numbers, they are already in the buffer
+            error = exc
+        else:
+            OrderOutbox.objects.filter(id__in=[event.id for event in events]).update(dispatched_at=timezone.now())
+    if error is not None:
+        raise error
+    return len(events)
+
+
+def purge_order_outbox(retention=timedelta(hours=1)):
+    """
+    Delete events dispatched longer than retention ago
+    """
+    deleted, _ = OrderOutbox.objects.filter(dispatched_at__lt=timezone.now() - retention).delete()
+    return deleted
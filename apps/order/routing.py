@@ -1,6 +1,7 @@
 from django.urls import re_path
-from .consumers import OrderConsumer
+from .consumers import OrderConsumer, ClientOrderConsumer
 
 websocket_urlpatterns = [
     re_path(r'^ws/orders/$', OrderConsumer.as_asgi()),
+    re_path(r'^ws/my-orders/$', ClientOrderConsumer.as_asgi()),
 ]
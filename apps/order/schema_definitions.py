@@ -95,3 +95,25 @@ order_statistics_parameters = [
         location=OpenApiParameter.QUERY
     )
 ]
+
+order_export_parameters = [
+    OpenApiParameter(
+        name='export_format',
+        description='File format of the export, csv (default) or ndjson',
+        required=False,
+        type=OpenApiTypes.STR,
+        enum=['csv', 'ndjson'],
+        location=OpenApiParameter.QUERY
+    ),
+    *order_statistics_parameters,
+]
+order_export_responses = {
+    (200, 'text/csv'): OpenApiResponse(
+        response=OpenApiTypes.BINARY,
+        description="Streamed orders of the establishment"
+    ),
+    (200, 'application/x-ndjson'): OpenApiResponse(
+        response=OpenApiTypes.BINARY,
+        description="Streamed orders of the establishment, one JSON object per line"
+    ),
+}
@@ -2,25 +2,25 @@ from django.contrib.auth import get_user_model
 
 from rest_framework import serializers
 
+from apps.beverage.models import Beverage
 from .models import Order
 
-from .utils import validate_order_happyhours, validate_order_per_hour, validate_order_per_day
+from .utils import validate_order_admission
 
 User = get_user_model()
 
 
 class OrderSerializer(serializers.ModelSerializer):
+    beverage = serializers.PrimaryKeyRelatedField(queryset=Beverage.objects.select_related('category'))
+
     class Meta:
         model = Order
         fields = ['id', 'client', 'beverage', 'establishment', 'order_date']
         read_only_fields = ['client', 'establishment']
 
     def validate(self, data):
-        establishment = data.get('beverage').establishment
         client = self.context['request'].user
-        validate_order_happyhours(establishment)
-        validate_order_per_hour(client)
-        validate_order_per_day(client, establishment)
+        data['establishment'] = validate_order_admission(client, data.get('beverage'))
 
         return data
 
@@ -40,11 +40,7 @@ class OwnerOrderSerializer(OrderSerializer):
         except User.DoesNotExist:
             raise serializers.ValidationError({'client_email': 'No user found with this email address.'})
         data['client'] = client
-
-        establishment = data.get('beverage').establishment
-        validate_order_happyhours(establishment)
-        validate_order_per_hour(client)
-        validate_order_per_day(client, establishment)
+        data['establishment'] = validate_order_admission(client, data.get('beverage'))
 
         return data
 
@@ -53,7 +49,7 @@ class OrderHistorySerializer(serializers.ModelSerializer):
     establishment_name = serializers.CharField(
         source="establishment.name", read_only=True
     )
-    beverage_name = serializers.CharField(source="beverage.name", read_only=True)
+    beverage_name = serializers.CharField(read_only=True)
     client = serializers.CharField(source="client.name", read_only=True)
     client_details = serializers.HyperlinkedRelatedField(
         view_name='v1:clients-profile-admin',
@@ -66,9 +62,18 @@ class OrderHistorySerializer(serializers.ModelSerializer):
 
 
 class IncomingOrderSerializer(serializers.ModelSerializer):
-    beverage_name = serializers.CharField(source='beverage.name', read_only=True)
+    beverage_name = serializers.CharField(read_only=True)
     client = serializers.CharField(source='client.name', read_only=True)
 
     class Meta:
         model = Order
         fields = ["id", "order_date", "establishment", "beverage_name", "client", "status"]
+
+
+class OrderStatusSerializer(serializers.ModelSerializer):
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+
+    class Meta:
+        model = Order
+        fields = ["id", "establishment", "order_date", "status"]
+        read_only_fields = ["id", "establishment", "order_date"]
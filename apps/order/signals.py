@@ -1,28 +1,36 @@
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from .ledger import record_order_on_commit, release_order_on_commit
 from .models import Order
-from django.core.cache import cache
+from .outbox import enqueue_order_notification
+from .statistics import add_order_statistic, remove_order_statistic
 
 
 @receiver(post_save, sender=Order)
 def send_order_notification(sender, instance, created, **kwargs):
-    channel_layer = get_channel_layer()
-    group_name = f'order_{instance.establishment.id}'
-
-    message = {
-        "type": "order_message",
-        "order_id": instance.id,
-        "establishment_id": instance.establishment.id,
-        "status": instance.status,
-        "client": instance.client.name,
-        "beverage": instance.beverage.name,
-        "details": f"New order created: {instance.id}" if created else f"Order updated: {instance.id}"
-    }
-
-    # Send the message to the group
-    async_to_sync(channel_layer.group_send)(
-        group_name,
-        message
-    )
+    enqueue_order_notification(instance, created)
+
+
+@receiver(post_save, sender=Order)
+def update_order_ledger(sender, instance, created, **kwargs):
+    if instance.status == 'cancelled':
+        release_order_on_commit(instance)
+    elif created:
+        record_order_on_commit(instance)
+
+
+@receiver(post_delete, sender=Order)
+def release_order_ledger(sender, instance, **kwargs):
+    release_order_on_commit(instance)
+
+
+@receiver(post_save, sender=Order)
+def update_order_statistics(sender, instance, created, **kwargs):
+    # Every status is counted, so only creation changes the rollup
+    if created:
+        add_order_statistic(instance, 1)
+
+
+@receiver(post_delete, sender=Order)
+def remove_order_statistics(sender, instance, **kwargs):
+    remove_order_statistic(instance)
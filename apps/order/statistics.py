@@ -0,0 +1,146 @@
+import datetime
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Order, OrderDailyStatistic
+
+
+def get_order_day(order_date):
+    return timezone.localtime(order_date).date()
+
+
+def get_day_start(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def add_order_statistic(order, delta):
+    """
+    Adds delta orders with the order's category and price snapshot
+    to the rollup row of the order's day with a single upsert
+    """
+    table = connection.ops.quote_name(OrderDailyStatistic._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (establishment_id, day, category_name, order_count, revenue)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (establishment_id, day, category_name) DO UPDATE
+            SET order_count = {table}.order_count + EXCLUDED.order_count,
+                revenue = {table}.revenue + EXCLUDED.revenue
+            """,
+            [order.establishment_id, get_order_day(order.order_date), order.category_name, delta, delta * order.price],
+        )
+
+
+def remove_order_statistic(order):
+    """
+    Takes a deleted order out of its rollup row. A plain UPDATE, so a row
+    already removed by a cascade from the establishment is not recreated
+    """
+    table = connection.ops.quote_name(OrderDailyStatistic._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table} SET order_count = order_count - 1, revenue = revenue - %s
+            WHERE establishment_id = %s AND day = %s AND category_name = %s
+            """,
+            [order.price, order.establishment_id, get_order_day(order.order_date), order.category_name],
+        )
+
+
+def rebuild_order_statistics():
+    """
+    Recompute the whole rollup from the Order table
+    """
+    rows = (
+        Order.objects.annotate(day=TruncDate('order_date'))
+        .values('establishment_id', 'day', 'category_name')
+        .annotate(order_count=Count('id'), revenue=Sum('price'))
+        .order_by()
+    )
+    OrderDailyStatistic.objects.all().delete()
+    statistics = OrderDailyStatistic.objects.bulk_create(
+        (
+            OrderDailyStatistic(
+                establishment_id=row['establishment_id'],
+                day=row['day'],
+                category_name=row['category_name'],
+                order_count=row['order_count'],
+                revenue=row['revenue'],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+    return len(statistics)
+
+
+def get_rollup_days(start, end):
+    """
+    First and last day fully covered by [start, end] that are already over.
+    The current day is always read from the Order table
+    """
+    first_day = None
+    if start is not None:
+        first_day = get_order_day(start)
+        if get_day_start(first_day) < start:
+            first_day += datetime.timedelta(days=1)
+    last_day = timezone.localdate() - datetime.timedelta(days=1)
+    if end is not None:
+        end_day = get_order_day(end)
+        if end < get_day_start(end_day + datetime.timedelta(days=1)) - datetime.timedelta(microseconds=1):
+            end_day -= datetime.timedelta(days=1)
+        last_day = min(last_day, end_day)
+    return first_day, last_day
+
+
+def get_order_statistics(establishment, start=None, end=None):
+    """
+    Order statistics of establishment for orders of every status placed
+    in [start, end].
+    Complete past days come from the daily rollup, partial days at the
+    edges of the range and the current day from the Order table
+    """
+    first_day, last_day = get_rollup_days(start, end)
+    rollup = OrderDailyStatistic.objects.filter(establishment=establishment, day__lte=last_day)
+    orders = Order.objects.filter(establishment=establishment)
+    if start is not None:
+        orders = orders.filter(order_date__gte=start)
+    if end is not None:
+        orders = orders.filter(order_date__lte=end)
+
+    if first_day is not None and first_day > last_day:
+        rollup = rollup.none()
+    else:
+        covered = Q(order_date__lt=get_day_start(last_day + datetime.timedelta(days=1)))
+        if first_day is not None:
+            rollup = rollup.filter(day__gte=first_day)
+            covered &= Q(order_date__gte=get_day_start(first_day))
+        orders = orders.exclude(covered)
+
+    categories = {}
+    rollup_rows = rollup.values('category_name').annotate(
+        total_orders=Sum('order_count'), total_sum=Sum('revenue')
+    ).order_by()
+    order_rows = orders.values('category_name').annotate(
+        total_orders=Count('id'), total_sum=Sum('price')
+    ).order_by()
+    for row in [*rollup_rows, *order_rows]:
+        category = categories.setdefault(row['category_name'], [0, Decimal(0)])
+        category[0] += row['total_orders']
+        category[1] += row['total_sum'] or 0
+
+    orders_by_category = [
+        {'category': name, 'total_orders': total_orders}
+        for name, (total_orders, _) in sorted(categories.items()) if total_orders
+    ]
+    total_orders = sum(total_orders for total_orders, _ in categories.values())
+    return {
+        'total_orders': total_orders,
+        'total_sum_prices': sum(total_sum for _, total_sum in categories.values()) if total_orders else None,
+        'orders_by_category': orders_by_category,
+    }
@@ -1,4 +1,7 @@
+from datetime import timedelta
+
 import pytest
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.urls import reverse
@@ -44,6 +47,43 @@ class TestOrderViews:
         assert response.data["client"] == user.id
         assert response.data["establishment"] == beverage.establishment.id
 
+    def test_place_order_query_count(self, django_assert_num_queries):
+        user = UserFactory(role="client")
+        SubscriptionFactory(user=user)
+        self.client.force_authenticate(user=user)
+        order_data = {"beverage": self.beverage.id}
+        # savepoint, client lock, beverage lookup, admission check, order insert,
+        # outbox insert, statistics upsert, savepoint release, client unlock
+        with django_assert_num_queries(9):
+            response = self.client.post(self.place_order_url, order_data)
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_place_order_error_codes(self, order_ledger, django_capture_on_commit_callbacks):
+        user = UserFactory(role="client")
+        SubscriptionFactory(user=user)
+        self.client.force_authenticate(user=user)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self.client.post(self.place_order_url, {"beverage": self.beverage.id})
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = self.client.post(self.place_order_url, {"beverage": self.beverage.id})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["error_code"] == 2
+
+        # the ledger only sees orders through placements, so backdate both
+        Order.objects.filter(client=user).update(order_date=timezone.now() - timedelta(minutes=61))
+        order_ledger.clear()
+        order_ledger.record(Order.objects.get(client=user))
+        response = self.client.post(self.place_order_url, {"beverage": self.beverage.id})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["error_code"] == 3
+
+    def test_place_order_without_subscription(self):
+        user = UserFactory(role="client")
+        self.client.force_authenticate(user=user)
+        response = self.client.post(self.place_order_url, {"beverage": self.beverage.id})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
     def test_client_order_history_permissions(self):
         response = self.client.get(self.client_order_history_url)
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
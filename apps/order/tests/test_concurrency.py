@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.order.models import Order
+from happyhours.factories import UserFactory, EstablishmentFactory, BeverageFactory, SubscriptionFactory
+
+PARALLEL_PLACEMENTS = 8
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_placements_admit_one_order():
+    user = UserFactory(role="client")
+    SubscriptionFactory(user=user)
+    establishment = EstablishmentFactory(happyhours_start="00:00:00", happyhours_end="23:59:59")
+    beverage = BeverageFactory(establishment=establishment)
+    url = reverse("v1:place-order")
+
+    barrier = threading.Barrier(PARALLEL_PLACEMENTS)
+    status_codes = []
+
+    def place_order():
+        client = APIClient()
+        client.force_authenticate(user=user)
+        try:
+            barrier.wait()
+            response = client.post(url, {"beverage": beverage.id})
+            status_codes.append(response.status_code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=place_order) for _ in range(PARALLEL_PLACEMENTS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert status_codes.count(status.HTTP_201_CREATED) == 1
+    assert status_codes.count(status.HTTP_400_BAD_REQUEST) == PARALLEL_PLACEMENTS - 1
+    assert Order.objects.filter(client=user).count() == 1
@@ -1,5 +1,7 @@
+import asyncio
 import pytest
 import json
+from unittest.mock import patch
 
 from channels.db import database_sync_to_async
 from channels.layers import get_channel_layer
@@ -7,6 +9,9 @@ from channels.testing import WebsocketCommunicator
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import AccessToken
 
+from apps.order import metrics
+from apps.order.consumers import get_batch_window
+from apps.order.outbox import dispatch_order_outbox
 from happyhours.asgi import application
 from happyhours.factories import UserFactory, EstablishmentFactory, BeverageFactory, OrderFactory
 
@@ -28,6 +33,12 @@ async def test_order_consumer():
     connected, subprotocol = await communicator.connect()
     assert connected, "Connection to websocket failed"
 
+    snapshot = await communicator.receive_json_from()
+    assert snapshot['type'] == 'order_snapshot'
+    assert snapshot['establishment_id'] == establishment.id
+    assert snapshot['seq'] == 0
+    assert [item['id'] for item in snapshot['orders']] == [order.id]
+
     group_name = f'order_{establishment.id}'
     message = {
         'type': 'order_message',
@@ -41,7 +52,7 @@ async def test_order_consumer():
     channel_layer = get_channel_layer()
     await channel_layer.group_send(group_name, message)
     response = await communicator.receive_json_from()
-    assert response == message
+    assert response == {**message, 'seq': None}
 
     await communicator.send_json_to({
         'type': 'update_order',
@@ -53,6 +64,152 @@ async def test_order_consumer():
     await communicator.disconnect()
 
 
+@pytest.mark.django_db
+@pytest.mark.asyncio
+async def test_order_consumer_resumes_from_last_seq(order_event_log):
+    user = await database_sync_to_async(UserFactory)(role='partner')
+    establishment = await database_sync_to_async(EstablishmentFactory)(owner=user)
+    other_establishment = await database_sync_to_async(EstablishmentFactory)(owner=user)
+    for order_id in (1, 2, 3):
+        order_event_log.append(establishment.id, {
+            'type': 'order_message',
+            'order_id': order_id,
+            'establishment_id': establishment.id,
+            'status': 'pending',
+            'client': 'client',
+            'beverage': 'beverage',
+            'details': f"New order created: {order_id}",
+        })
+
+    token = AccessToken.for_user(user)
+    communicator = WebsocketCommunicator(
+        application, f"/ws/orders/?token={token}&last_seq={establishment.id}:1"
+    )
+    connected, _ = await communicator.connect()
+    assert connected
+
+    replayed = [await communicator.receive_json_from() for _ in range(2)]
+    assert [(event['order_id'], event['seq']) for event in replayed] == [(2, 2), (3, 3)]
+    snapshot = await communicator.receive_json_from()
+    assert snapshot['type'] == 'order_snapshot'
+    assert snapshot['establishment_id'] == other_establishment.id
+
+    # already replayed events arriving through the group are skipped
+    channel_layer = get_channel_layer()
+    await channel_layer.group_send(f'order_{establishment.id}', {**replayed[1], 'type': 'order_message'})
+    assert await communicator.receive_nothing()
+
+    await communicator.disconnect()
+
+
+@pytest.mark.django_db
+@pytest.mark.asyncio
+async def test_order_consumer_batches_events():
+    user = await database_sync_to_async(UserFactory)(role='partner')
+    establishment = await database_sync_to_async(EstablishmentFactory)(owner=user)
+    metrics.reset_counters()
+
+    token = AccessToken.for_user(user)
+    communicator = WebsocketCommunicator(application, f"/ws/orders/?token={token}&batch=50")
+    connected, _ = await communicator.connect()
+    assert connected
+    assert (await communicator.receive_json_from())['type'] == 'order_snapshot'
+
+    channel_layer = get_channel_layer()
+    for seq, (order_id, order_status) in enumerate(
+        [(1, 'pending'), (2, 'pending'), (1, 'in_preparation')], start=1
+    ):
+        await channel_layer.group_send(f'order_{establishment.id}', {
+            'type': 'order_message',
+            'order_id': order_id,
+            'establishment_id': establishment.id,
+            'status': order_status,
+            'client': 'client',
+            'beverage': 'beverage',
+            'details': f"Order updated: {order_id}",
+            'seq': seq,
+        })
+
+    batch = await communicator.receive_json_from(timeout=1)
+    assert batch['type'] == 'order_batch'
+    assert [(order['order_id'], order['status'], order['seq']) for order in batch['orders']] == [
+        (1, 'in_preparation', 3), (2, 'pending', 2),
+    ]
+    assert await communicator.receive_nothing()
+
+    counters = metrics.get_counters()
+    assert counters['ws_events_coalesced'] == 1
+    assert counters['ws_frames_saved'] == 2
+    assert counters['ws_bytes_saved'] > 0
+
+    await communicator.disconnect()
+
+
+@pytest.mark.django_db
+@pytest.mark.asyncio
+async def test_client_order_consumer():
+    client = await database_sync_to_async(UserFactory)(role='client')
+    order = await database_sync_to_async(OrderFactory)(client=client)
+
+    token = AccessToken.for_user(client)
+    communicator = WebsocketCommunicator(application, f"/ws/my-orders/?token={token}")
+    connected, _ = await communicator.connect()
+    assert connected
+
+    order.status = 'completed'
+    await database_sync_to_async(order.save)()
+    await database_sync_to_async(dispatch_order_outbox)()
+
+    created = await communicator.receive_json_from()
+    assert created['order_id'] == order.id
+    assert created['status'] == 'pending'
+    updated = await communicator.receive_json_from()
+    assert updated['status'] == 'completed'
+    assert updated['client'] == client.name
+
+    await communicator.disconnect()
+
+
+@pytest.mark.django_db
+@pytest.mark.asyncio
+async def test_client_order_consumer_rejects_partners():
+    partner = await database_sync_to_async(UserFactory)(role='partner')
+    token = AccessToken.for_user(partner)
+    communicator = WebsocketCommunicator(application, f"/ws/my-orders/?token={token}")
+    connected, _ = await communicator.connect()
+    assert not connected
+
+
+@pytest.mark.django_db
+@pytest.mark.asyncio
+async def test_order_consumer_refreshes_group_membership(settings):
+    settings.ORDER_GROUP_REFRESH_INTERVAL = 0.01
+    user = await database_sync_to_async(UserFactory)(role='partner')
+    establishment = await database_sync_to_async(EstablishmentFactory)(owner=user)
+
+    token = AccessToken.for_user(user)
+    communicator = WebsocketCommunicator(application, f"/ws/orders/?token={token}")
+    connected, _ = await communicator.connect()
+    assert connected
+    await communicator.receive_json_from()
+
+    channel_layer = get_channel_layer()
+    with patch.object(channel_layer, 'group_add', wraps=channel_layer.group_add) as group_add:
+        await asyncio.sleep(0.05)
+    assert group_add.call_count >= 1
+    assert group_add.call_args[0][0] == f'order_{establishment.id}'
+
+    await communicator.disconnect()
+
+
+def test_get_batch_window():
+    assert get_batch_window(None) is None
+    assert get_batch_window('abc') is None
+    assert get_batch_window('10') == 0.05
+    assert get_batch_window('120') == 0.12
+    assert get_batch_window('1000') == 0.2
+
+
 @pytest.fixture
 def user():
     return UserFactory()
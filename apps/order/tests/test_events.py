@@ -0,0 +1,73 @@
+from unittest.mock import patch
+
+import pytest
+from channels.layers import get_channel_layer
+
+from happyhours.factories import OrderFactory
+from ..events import LocMemOrderEventLog, parse_last_seq
+from ..models import OrderOutbox
+from ..outbox import dispatch_order_outbox
+
+
+def test_event_log_assigns_sequence_per_establishment():
+    event_log = LocMemOrderEventLog()
+
+    assert event_log.append(1, {'order_id': 10}) == 1
+    assert event_log.append(1, {'order_id': 11}) == 2
+    assert event_log.append(2, {'order_id': 12}) == 1
+    assert event_log.current_seq(1) == 2
+    assert event_log.current_seq(3) == 0
+
+
+def test_event_log_replays_missed_events():
+    event_log = LocMemOrderEventLog()
+    for order_id in range(3):
+        event_log.append(1, {'order_id': order_id})
+
+    assert event_log.read_since(1, 1) == [{'order_id': 1, 'seq': 2}, {'order_id': 2, 'seq': 3}]
+    assert event_log.read_since(1, 3) == []
+    # resume from the future, e.g. after the log was reset
+    assert event_log.read_since(1, 4) is None
+
+
+def test_event_log_requires_snapshot_after_buffer_overflow():
+    event_log = LocMemOrderEventLog(buffer_size=2)
+    for order_id in range(4):
+        event_log.append(1, {'order_id': order_id})
+
+    assert event_log.read_since(1, 2) == [{'order_id': 2, 'seq': 3}, {'order_id': 3, 'seq': 4}]
+    assert event_log.read_since(1, 1) is None
+
+
+def test_parse_last_seq():
+    assert parse_last_seq('1:5,2:0') == {1: 5, 2: 0}
+    assert parse_last_seq('1:x,abc,3:7') == {3: 7}
+    assert parse_last_seq(None) == {}
+
+
+@pytest.mark.django_db
+def test_dispatch_stamps_sequence_numbers(order_event_log):
+    order = OrderFactory()
+    order.status = 'in_preparation'
+    order.save()
+
+    assert dispatch_order_outbox() == 2
+    events = order_event_log.read_since(order.establishment_id, 0)
+    assert [event['seq'] for event in events] == [1, 2]
+    assert [event['status'] for event in events] == ['pending', 'in_preparation']
+
+
+@pytest.mark.django_db
+def test_retried_dispatch_keeps_sequence_numbers(order_event_log):
+    order = OrderFactory()
+    channel_layer = get_channel_layer()
+
+    with patch.object(channel_layer, 'group_send', side_effect=ConnectionError):
+        with pytest.raises(ConnectionError):
+            dispatch_order_outbox()
+    assert OrderOutbox.objects.get(dispatched_at__isnull=True).seq == 1
+
+    with patch.object(channel_layer, 'group_send') as group_send:
+        assert dispatch_order_outbox() == 1
+    assert {called_args[1]['seq'] for called_args, _ in group_send.call_args_list} == {1}
+    assert [event['seq'] for event in order_event_log.read_since(order.establishment_id, 0)] == [1]
@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.order.exports import iter_csv, iter_ndjson
+from apps.order.models import Order
+from happyhours.factories import UserFactory, EstablishmentFactory, BeverageFactory, OrderFactory
+
+
+@pytest.fixture
+def partner():
+    return UserFactory(role='partner')
+
+
+@pytest.fixture
+def orders(partner):
+    establishment = EstablishmentFactory(owner=partner)
+    beverage = BeverageFactory(establishment=establishment)
+    return [OrderFactory(establishment=establishment, beverage=beverage) for _ in range(3)]
+
+
+def get_content(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_partner_order_export_csv(partner, orders):
+    client = APIClient()
+    client.force_authenticate(user=partner)
+    url = reverse('v1:partner-order-export', args=[orders[0].establishment_id])
+
+    response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'] == 'text/csv'
+
+    rows = list(csv.DictReader(io.StringIO(get_content(response))))
+    assert [int(row['id']) for row in rows] == [order.id for order in orders]
+    assert rows[0]['beverage'] == orders[0].beverage_name
+    assert rows[0]['client_email'] == orders[0].client.email
+
+
+@pytest.mark.django_db
+def test_partner_order_export_ndjson_with_date_filter(partner, orders):
+    Order.objects.filter(id=orders[0].id).update(order_date=timezone.now() - timedelta(days=5))
+    client = APIClient()
+    client.force_authenticate(user=partner)
+    url = reverse('v1:partner-order-export', args=[orders[0].establishment_id])
+
+    response = client.get(url, {
+        'export_format': 'ndjson',
+        'order_date__gte': (timezone.now() - timedelta(days=1)).isoformat(),
+    })
+    assert response.status_code == status.HTTP_200_OK
+
+    rows = [json.loads(line) for line in get_content(response).splitlines()]
+    assert [row['id'] for row in rows] == [order.id for order in orders[1:]]
+
+
+def test_csv_export_escapes_formulas():
+    rows = [
+        (1, None, 'new', '=HYPERLINK("http://x")', '+Beer', '-1', '@SUM(A1)', '\tTab'),
+        (2, None, 'new', 'Lager', 'Beer', -1, 'Ann', 'ann@example.com'),
+    ]
+    csv_rows = list(csv.reader(io.StringIO(''.join(iter_csv(rows)))))
+    assert csv_rows[1][3:] == ['\'=HYPERLINK("http://x")', "'+Beer", "'-1", "'@SUM(A1)", "'\tTab"]
+    assert csv_rows[2][3:] == ['Lager', 'Beer', '-1', 'Ann', 'ann@example.com']
+
+    ndjson_row = json.loads(next(iter_ndjson(rows[:1])))
+    assert ndjson_row['beverage'] == '=HYPERLINK("http://x")'
+
+
+@pytest.mark.django_db
+def test_partner_order_export_permissions(orders):
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(role='partner'))
+    url = reverse('v1:partner-order-export', args=[orders[0].establishment_id])
+
+    response = client.get(url)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    client.force_authenticate(user=orders[0].establishment.owner)
+    response = client.get(url, {'export_format': 'xlsx'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client.get(reverse('v1:partner-order-export', args=[0]))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
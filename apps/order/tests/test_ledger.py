@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from happyhours.factories import UserFactory, EstablishmentFactory, BeverageFactory, OrderFactory
+from ..models import Order
+
+
+@pytest.fixture
+def order(django_capture_on_commit_callbacks):
+    establishment = EstablishmentFactory()
+    beverage = BeverageFactory(establishment=establishment)
+    with django_capture_on_commit_callbacks(execute=True):
+        return OrderFactory(client=UserFactory(), beverage=beverage, establishment=establishment)
+
+
+@pytest.mark.django_db
+def test_ledger_records_created_order(order_ledger, order):
+    assert order_ledger.lookup(order.client_id, order.establishment_id) == (True, True)
+    assert order_ledger.has_order_last_hour(order.client_id)
+    assert order_ledger.has_order_today(order.client_id, order.establishment_id)
+    assert not order_ledger.has_order_today(order.client_id, order.establishment_id + 1)
+
+
+@pytest.mark.django_db
+def test_ledger_releases_cancelled_order(order_ledger, order, django_capture_on_commit_callbacks):
+    order.status = 'cancelled'
+    with django_capture_on_commit_callbacks(execute=True):
+        order.save()
+
+    assert order_ledger.lookup(order.client_id, order.establishment_id) == (False, False)
+
+
+@pytest.mark.django_db
+def test_ledger_keeps_windows_of_other_orders(order_ledger, order, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        newer = OrderFactory(client=order.client, beverage=order.beverage, establishment=order.establishment)
+    order_ledger.release(order)
+
+    assert order_ledger.lookup(newer.client_id, newer.establishment_id) == (True, True)
+
+
+@pytest.mark.django_db
+def test_ledger_hour_window_expires(order_ledger, order):
+    order.order_date = timezone.now() - timedelta(minutes=61)
+    order_ledger.record(order)
+
+    assert not order_ledger.has_order_last_hour(order.client_id)
+
+
+@pytest.mark.django_db
+def test_rebuild_order_ledger_command(order_ledger, order):
+    order_ledger.clear()
+    assert order_ledger.lookup(order.client_id, order.establishment_id) == (False, False)
+
+    cancelled = OrderFactory(status='cancelled')
+    order_ledger.clear()
+    call_command('rebuild_order_ledger')
+
+    assert order_ledger.lookup(order.client_id, order.establishment_id) == (True, True)
+    assert order_ledger.lookup(cancelled.client_id, cancelled.establishment_id) == (False, False)
+    assert Order.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_ledger_skips_rolled_back_order(order_ledger, django_capture_on_commit_callbacks):
+    client = UserFactory()
+    with django_capture_on_commit_callbacks(execute=True):
+        try:
+            with transaction.atomic():
+                OrderFactory(client=client)
+                raise DatabaseError
+        except DatabaseError:
+            pass
+
+    assert not order_ledger.has_order_last_hour(client.id)
+
+
+@pytest.mark.django_db
+def test_rebuild_replaces_ledger_contents(order_ledger, order):
+    stale = OrderFactory.build(client=UserFactory(), establishment=order.establishment, order_date=timezone.now())
+    order_ledger.record(stale)
+
+    order_ledger.rebuild(Order.objects.all())
+
+    assert order_ledger.lookup(order.client_id, order.establishment_id) == (True, True)
+    assert not order_ledger.has_order_last_hour(stale.client_id)
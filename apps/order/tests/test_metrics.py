@@ -0,0 +1,44 @@
+import json
+import logging
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+
+from .. import metrics
+
+
+def test_channel_overflow_handler_counts_skipped_channels(caplog):
+    # LOGGING sets the level, see settings.base
+    caplog.set_level(logging.INFO, logger='channels_redis.core')
+    metrics.reset_counters()
+    metrics.install_channel_overflow_handler()
+    logger = logging.getLogger('channels_redis.core')
+
+    logger.info("%s of %s channels over capacity in group %s", 3, 10, 'order_1')
+    logger.info("unrelated message")
+
+    counters = metrics.get_counters()
+    assert counters['channel_layer_over_capacity'] == 3
+    assert counters['channel_layer_over_capacity_sends'] == 1
+
+
+def test_channel_overflow_handler_is_installed_once():
+    metrics.install_channel_overflow_handler()
+    metrics.install_channel_overflow_handler()
+
+    handlers = logging.getLogger('channels_redis.core').handlers
+    assert sum(isinstance(handler, metrics.ChannelOverflowHandler) for handler in handlers) == 1
+
+
+def test_counters_are_flushed_to_the_shared_cache():
+    metrics.reset_counters()
+    metrics.increment('ws_frames_sent', 2)
+    with patch.object(metrics, 'FLUSH_INTERVAL', 0):
+        metrics.increment('ws_frames_sent')
+
+    assert metrics._counters == {}
+    output = StringIO()
+    call_command('show_order_metrics', '--reset', stdout=output)
+    assert json.loads(output.getvalue())['ws_frames_sent'] == 3
+    assert metrics.get_counters()['ws_frames_sent'] == 0
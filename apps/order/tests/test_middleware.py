@@ -0,0 +1,56 @@
+import pytest
+from asgiref.sync import async_to_sync
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from rest_framework_simplejwt.tokens import AccessToken
+
+from happyhours.asgi import application
+from happyhours.factories import UserFactory
+from ..checks import check_shared_cache
+from ..middleware import get_user, get_user_cache_key, revoke_cached_user
+
+
+@pytest.mark.django_db
+def test_user_is_cached_per_token(django_assert_num_queries):
+    user = UserFactory(role='partner')
+    token = AccessToken.for_user(user)
+
+    with django_assert_num_queries(1):
+        assert async_to_sync(get_user)(user.id, token['jti'], token['exp']) == user
+    with django_assert_num_queries(0):
+        cached = async_to_sync(get_user)(user.id, token['jti'], token['exp'])
+        assert (cached, cached.role, str(cached)) == (user, 'partner', str(user))
+    assert cache.get(get_user_cache_key(user.id, token['jti'])) == {
+        'id': user.id, 'email': user.email, 'role': 'partner', 'is_active': True, 'is_blocked': False,
+    }
+
+
+@pytest.mark.django_db
+def test_revoked_user_is_reloaded(django_assert_num_queries):
+    user = UserFactory(role='partner')
+    token = AccessToken.for_user(user)
+    async_to_sync(get_user)(user.id, token['jti'], token['exp'])
+
+    user.is_blocked = True
+    user.save()
+    revoke_cached_user(user.id)
+
+    with django_assert_num_queries(1):
+        assert async_to_sync(get_user)(user.id, token['jti'], token['exp']) is None
+
+
+@pytest.mark.django_db
+@pytest.mark.asyncio
+@pytest.mark.parametrize('query_string', ['', 'token=invalid'])
+async def test_connection_without_valid_token_is_rejected(query_string):
+    communicator = WebsocketCommunicator(application, f"/ws/orders/?{query_string}")
+    connected, _ = await communicator.connect()
+    assert not connected
+
+
+def test_per_process_cache_is_reported(settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    assert [warning.id for warning in check_shared_cache(None)] == ['order.W001']
+
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+    assert check_shared_cache(None) == []
@@ -0,0 +1,53 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.order.models import Order
+from happyhours.factories import UserFactory, OrderFactory
+
+
+@pytest.mark.django_db
+def test_client_order_history_cursor_pagination():
+    user = UserFactory(role="client")
+    orders = [OrderFactory(client=user) for _ in range(5)]
+    # Two orders share a timestamp, the id keeps their position stable
+    same_date = timezone.now()
+    Order.objects.filter(id__in=[orders[1].id, orders[2].id]).update(order_date=same_date)
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("v1:client-order-history-list")
+
+    response = client.get(url, {"pagination": "cursor", "limit": 2})
+    assert response.status_code == status.HTTP_200_OK
+    seen = [order["id"] for order in response.data["results"]]
+    next_link = response.data["next"]
+    while next_link:
+        response = client.get(next_link)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) <= 2
+        seen.extend(order["id"] for order in response.data["results"])
+        next_link = response.data["next"]
+
+    expected = list(Order.objects.filter(client=user).order_by("-order_date", "-id").values_list("id", flat=True))
+    assert seen == expected
+
+
+@pytest.mark.django_db
+def test_client_order_history_keeps_limit_offset_by_default():
+    user = UserFactory(role="client")
+    OrderFactory(client=user)
+    OrderFactory(client=user)
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("v1:client-order-history-list")
+
+    response = client.get(url, {"limit": 1})
+    assert response.data["count"] == 2
+    assert len(response.data["results"]) == 1
+
+    response = client.get(url, {"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -107,13 +107,14 @@ def test_order_happyhours_validation(order, beverage, api_request_factory):
 
 
 @pytest.mark.django_db
-def test_order_per_hour_validation(user, beverage, api_request_factory):
+def test_order_per_hour_validation(user, beverage, api_request_factory, django_capture_on_commit_callbacks):
     request = api_request_factory.post('/')
     request.user = user
 
     # Create an order within the last hour
-    OrderFactory(client=user, beverage=beverage, establishment=beverage.establishment,
-                 order_date=timezone.now() - timezone.timedelta(minutes=30))
+    with django_capture_on_commit_callbacks(execute=True):
+        OrderFactory(client=user, beverage=beverage, establishment=beverage.establishment,
+                     order_date=timezone.now() - timezone.timedelta(minutes=30))
 
     data = {
         'beverage': beverage.id,
@@ -127,13 +128,14 @@ def test_order_per_hour_validation(user, beverage, api_request_factory):
 
 
 @pytest.mark.django_db
-def test_order_per_day_validation(user, beverage, api_request_factory):
+def test_order_per_day_validation(user, beverage, api_request_factory, django_capture_on_commit_callbacks):
     request = api_request_factory.post('/')
     request.user = user
 
     # Create an order earlier today
-    OrderFactory(client=user, beverage=beverage, establishment=beverage.establishment,
-                 order_date=timezone.now() - timezone.timedelta(hours=3))
+    with django_capture_on_commit_callbacks(execute=True):
+        OrderFactory(client=user, beverage=beverage, establishment=beverage.establishment,
+                     order_date=timezone.now() - timezone.timedelta(hours=3))
 
     data = {
         'beverage': beverage.id,
@@ -162,21 +164,23 @@ def test_validate_order_happyhours():
 
 
 @pytest.mark.django_db
-def test_validate_order_per_hour():
+def test_validate_order_per_hour(django_capture_on_commit_callbacks):
     client = UserFactory()
 
-    OrderFactory(client=client, status='pending')
+    with django_capture_on_commit_callbacks(execute=True):
+        OrderFactory(client=client, status='pending')
     with pytest.raises(serializers.ValidationError, match="You can only place one order per hour."):
         validate_order_per_hour(client)
 
 
 
 @pytest.mark.django_db
-def test_validate_order_per_day():
+def test_validate_order_per_day(django_capture_on_commit_callbacks):
     client = UserFactory()
     establishment = EstablishmentFactory()
 
-    OrderFactory(client=client, establishment=establishment, order_date=timezone.now(), status='pending')
+    with django_capture_on_commit_callbacks(execute=True):
+        OrderFactory(client=client, establishment=establishment, order_date=timezone.now(), status='pending')
     with pytest.raises(serializers.ValidationError, match="You can only place one order per establishment per day."):
         validate_order_per_day(client, establishment)
 
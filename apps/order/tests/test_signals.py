@@ -1,11 +1,11 @@
 import pytest
-from django.db.models.signals import post_save
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync, sync_to_async
 
 from happyhours.factories import UserFactory, EstablishmentFactory, BeverageFactory, OrderFactory
-from ..models import Order, Establishment
+from ..models import OrderOutbox
+from ..outbox import dispatch_order_outbox
 from unittest.mock import patch
 
 User = get_user_model()
@@ -26,18 +26,72 @@ def test_order_notifications():
         with patch.object(channel_layer, 'group_send') as mock_group_send:
             order.save()
 
-            mock_group_send.assert_called_once()
-            called_args, _ = mock_group_send.call_args
-            assert called_args[0] == f'order_{establishment.id}'
-            assert called_args[1]['type'] == 'order_message'
-            assert 'New order created' in called_args[1]['details']
+            mock_group_send.assert_not_called()
+            event = OrderOutbox.objects.get(dispatched_at__isnull=True)
+            assert event.group_name == f'order_{establishment.id}'
+            assert event.payload['client'] == client.name
+            assert event.payload['beverage'] == beverage.name
 
+            assert dispatch_order_outbox() == 1
+            assert mock_group_send.call_count == 2
+            groups = {called_args[0]: called_args[1] for called_args, _ in mock_group_send.call_args_list}
+            assert set(groups) == {f'order_{establishment.id}', f'client_orders_{client.id}'}
+            message = groups[f'order_{establishment.id}']
+            assert message['type'] == 'order_message'
+            assert 'New order created' in message['details']
+            assert groups[f'client_orders_{client.id}'] == message
 
             mock_group_send.reset_mock()
 
             order.status = 'completed'
             order.save()
+            assert dispatch_order_outbox() == 1
 
-            mock_group_send.assert_called_once()
+            assert mock_group_send.call_count == 2
             called_args, _ = mock_group_send.call_args
             assert 'Order updated' in called_args[1]['details']
+            assert called_args[1]['status'] == 'completed'
+
+
+@pytest.mark.django_db
+def test_outbox_keeps_failed_batch():
+    order = OrderFactory()
+    channel_layer = get_channel_layer()
+
+    with patch.object(channel_layer, 'group_send', side_effect=ConnectionError):
+        with pytest.raises(ConnectionError):
+            dispatch_order_outbox()
+
+    assert OrderOutbox.objects.filter(
+        dispatched_at__isnull=True, payload__order_id=order.id
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_outbox_payload_without_extra_queries(django_assert_num_queries):
+    order = OrderFactory()
+
+    order.status = 'in_preparation'
+    # order update, outbox insert
+    with django_assert_num_queries(2):
+        order.save()
+
+
+@pytest.mark.django_db
+def test_dispatcher_survives_failing_sends():
+    order = OrderFactory()
+    channel_layer = get_channel_layer()
+    sends = []
+
+    async def group_send(group_name, message):
+        sends.append(group_name)
+        if len(sends) == 1:
+            raise ConnectionError
+
+    command = 'apps.order.management.commands.dispatch_order_outbox'
+    with patch.object(channel_layer, 'group_send', side_effect=group_send), \
+            patch(f'{command}.close_old_connections'), patch(f'{command}.time.sleep') as sleep:
+        call_command('dispatch_order_outbox', '--once')
+
+    sleep.assert_called_once_with(0.2)
+    assert not OrderOutbox.objects.filter(dispatched_at__isnull=True, payload__order_id=order.id).exists()
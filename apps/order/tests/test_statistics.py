@@ -0,0 +1,114 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from happyhours.factories import UserFactory, EstablishmentFactory, BeverageFactory, OrderFactory, CategoryFactory
+from ..models import Order, OrderDailyStatistic
+from ..statistics import get_order_statistics
+from ..transitions import transition_order_status
+
+
+@pytest.fixture
+def partner():
+    return UserFactory(role='partner')
+
+
+@pytest.fixture
+def beverage(partner):
+    establishment = EstablishmentFactory(owner=partner)
+    return BeverageFactory(establishment=establishment, category=CategoryFactory(name='Tea'), price=Decimal('100.00'))
+
+
+@pytest.mark.django_db
+def test_rollup_follows_order_changes(partner, beverage):
+    order = OrderFactory(establishment=beverage.establishment, beverage=beverage)
+    OrderFactory(establishment=beverage.establishment, beverage=beverage)
+
+    statistic = OrderDailyStatistic.objects.get(establishment=beverage.establishment)
+    assert statistic.category_name == 'Tea'
+    assert statistic.order_count == 2
+    assert statistic.revenue == Decimal('200.00')
+
+    # cancelled orders stay counted
+    transition_order_status(order.id, 'cancelled', partner)
+    statistic.refresh_from_db()
+    assert statistic.order_count == 2
+
+    order.delete()
+    statistic.refresh_from_db()
+    assert statistic.order_count == 1
+    assert statistic.revenue == Decimal('100.00')
+
+
+@pytest.mark.django_db
+def test_rollup_forgets_orders_of_deleted_beverages(beverage):
+    other = BeverageFactory(establishment=beverage.establishment, category=beverage.category, price=Decimal('50.00'))
+    OrderFactory(establishment=beverage.establishment, beverage=beverage)
+    OrderFactory(establishment=beverage.establishment, beverage=other)
+
+    other.delete()
+
+    statistic = OrderDailyStatistic.objects.get(establishment=beverage.establishment)
+    assert statistic.order_count == 1
+    assert statistic.revenue == Decimal('100.00')
+
+
+@pytest.mark.django_db
+def test_statistics_view_combines_rollup_and_current_day(partner, beverage):
+    establishment = beverage.establishment
+    old_order = OrderFactory(establishment=establishment, beverage=beverage)
+    Order.objects.filter(id=old_order.id).update(order_date=timezone.now() - timedelta(days=3))
+    OrderFactory(establishment=establishment, beverage=beverage)
+    call_command('rebuild_order_statistics')
+
+    client = APIClient()
+    client.force_authenticate(user=partner)
+    url = reverse('v1:order-statistics', kwargs={'establishment_id': establishment.id})
+
+    response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['total_orders'] == 2
+    assert response.data['total_sum_prices'] == Decimal('200.00')
+    assert response.data['orders_by_category'] == [{'category': 'Tea', 'total_orders': 2}]
+
+    response = client.get(url, {'order_date__gte': (timezone.now() - timedelta(days=1)).isoformat()})
+    assert response.data['total_orders'] == 1
+
+    response = client.get(url, {'order_date__lte': (timezone.now() - timedelta(days=2)).isoformat()})
+    assert response.data['total_orders'] == 1
+
+
+@pytest.mark.django_db
+def test_rebuild_order_statistics_command(beverage):
+    OrderFactory(establishment=beverage.establishment, beverage=beverage)
+    OrderFactory(establishment=beverage.establishment, beverage=beverage, status='cancelled')
+    OrderDailyStatistic.objects.all().delete()
+
+    call_command('rebuild_order_statistics')
+
+    statistic = OrderDailyStatistic.objects.get(establishment=beverage.establishment)
+    assert statistic.order_count == 2
+    assert statistic.revenue == Decimal('200.00')
+
+
+@pytest.mark.django_db
+def test_order_keeps_price_and_category_snapshot(partner, beverage):
+    order = OrderFactory(establishment=beverage.establishment, beverage=beverage)
+    beverage.price = Decimal('300.00')
+    beverage.category = CategoryFactory(name='Coffee')
+    beverage.save()
+
+    order.refresh_from_db()
+    assert order.price == Decimal('100.00')
+    assert order.category_name == 'Tea'
+    assert order.beverage_name == beverage.name
+
+    data = get_order_statistics(beverage.establishment)
+    assert data['total_sum_prices'] == Decimal('100.00')
+    assert data['orders_by_category'] == [{'category': 'Tea', 'total_orders': 1}]
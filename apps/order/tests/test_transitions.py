@@ -0,0 +1,81 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from happyhours.factories import UserFactory, EstablishmentFactory, BeverageFactory, OrderFactory
+from ..models import Order, OrderOutbox
+from ..transitions import transition_order_status
+
+
+@pytest.fixture
+def partner():
+    return UserFactory(role='partner')
+
+
+@pytest.fixture
+def order(partner, django_capture_on_commit_callbacks):
+    establishment = EstablishmentFactory(owner=partner)
+    beverage = BeverageFactory(establishment=establishment)
+    with django_capture_on_commit_callbacks(execute=True):
+        return OrderFactory(establishment=establishment, beverage=beverage, status='pending')
+
+
+@pytest.mark.django_db
+def test_order_status_transitions(partner, order):
+    client = APIClient()
+    client.force_authenticate(user=partner)
+    url = reverse('v1:order-status', kwargs={'order_id': order.id})
+
+    response = client.patch(url, {'status': 'in_preparation'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['status'] == 'in_preparation'
+
+    response = client.patch(url, {'status': 'completed'})
+    assert response.status_code == status.HTTP_200_OK
+    order.refresh_from_db()
+    assert order.status == 'completed'
+
+    response = client.patch(url, {'status': 'cancelled'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['error_code'] == 4
+
+
+@pytest.mark.django_db
+def test_order_status_skipping_state_is_rejected(partner, order):
+    client = APIClient()
+    client.force_authenticate(user=partner)
+    url = reverse('v1:order-status', kwargs={'order_id': order.id})
+
+    response = client.patch(url, {'status': 'completed'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = client.patch(url, {'status': 'unknown'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert Order.objects.get(id=order.id).status == 'pending'
+
+
+@pytest.mark.django_db
+def test_order_status_of_other_partner(order):
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(role='partner'))
+    url = reverse('v1:order-status', kwargs={'order_id': order.id})
+
+    response = client.patch(url, {'status': 'in_preparation'})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_transition_emits_one_notification(partner, order, order_ledger, django_assert_num_queries,
+                                           django_capture_on_commit_callbacks):
+    OrderOutbox.objects.all().delete()
+    assert order_ledger.lookup(order.client_id, order.establishment_id) == (True, True)
+
+    # savepoint, conditional update, outbox insert, savepoint release
+    with django_assert_num_queries(4), django_capture_on_commit_callbacks(execute=True):
+        updated = transition_order_status(order.id, 'cancelled', partner)
+
+    assert updated.status == 'cancelled'
+    event = OrderOutbox.objects.get()
+    assert event.payload['status'] == 'cancelled'
+    assert event.payload['client'] == order.client.name
+    assert order_ledger.lookup(order.client_id, order.establishment_id) == (False, False)
@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from rest_framework.exceptions import NotFound
+
+from apps.partner.models import Establishment
+from happyhours.utils import CustomValidationError
+
+from .ledger import release_order_on_commit
+from .models import Order
+from .outbox import enqueue_order_notification
+
+User = get_user_model()
+
+
+def get_transition_sql():
+    quote = connection.ops.quote_name
+    return f"""
+        UPDATE {quote(Order._meta.db_table)} AS o SET status = %s
+        FROM {quote(Establishment._meta.db_table)} AS e,
+             {quote(User._meta.db_table)} AS u
+        WHERE o.id = %s AND o.status = ANY(%s)
+          AND e.id = o.establishment_id AND e.owner_id = %s
+          AND u.id = o.client_id
+        RETURNING o.id, o.establishment_id, o.client_id, o.beverage_id, o.order_date, o.status,
+                  o.beverage_name, o.category_name, o.price, u.name
+    """
+
+
+def raise_transition_error(order_id, owner):
+    if not Order.objects.filter(id=order_id, establishment__owner=owner).exists():
+        raise NotFound("Order not found.")
+    raise CustomValidationError(
+        detail={
+            "error_code": 4,
+            "message": "Unable to Update Order"
+        }
+    )
+
+
+def transition_order_status(order_id, status, owner):
+    """
+    Move an order of one of owner's establishments to status.
+    The transition is a single conditional UPDATE, so concurrent updates
+    can not skip a state. Emits exactly one order notification.
+    Returns the updated order
+    """
+    try:
+        order_id = int(order_id)
+    except (TypeError, ValueError):
+        raise NotFound("Order not found.")
+    predecessors = Order.get_allowed_predecessors(status)
+    if not predecessors:
+        raise_transition_error(order_id, owner)
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(get_transition_sql(), [status, order_id, predecessors, owner.id])
+            row = cursor.fetchone()
+        if row is None:
+            raise_transition_error(order_id, owner)
+
+        (order_id, establishment_id, client_id, beverage_id, order_date, status,
+         beverage_name, category_name, price, client_name) = row
+        order = Order(
+            id=order_id,
+            establishment_id=establishment_id,
+            client_id=client_id,
+            beverage_id=beverage_id,
+            order_date=order_date,
+            status=status,
+            beverage_name=beverage_name,
+            category_name=category_name,
+            price=price,
+        )
+        enqueue_order_notification(order, created=False, client_name=client_name)
+        if status == 'cancelled':
+            release_order_on_commit(order)
+    return order
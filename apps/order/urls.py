@@ -2,7 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
 from .views import PlaceOrderView, ClientOrderHistoryView, PartnerOrderHistoryView, PartnerPlaceOrderView, \
-    OrderStatisticsView, IncomingOrdersView
+    OrderStatisticsView, IncomingOrdersView, OrderStatusUpdateView, PartnerOrderExportView
 
 router = DefaultRouter()
 router.register(
@@ -13,7 +13,10 @@ urlpatterns = [
     path("partner-place-order/", PartnerPlaceOrderView.as_view(), name="partner-place-order"),
     path("statistics/<int:establishment_id>/", OrderStatisticsView.as_view(), name='order-statistics'),
     path("orders/<int:establishment_id>/", IncomingOrdersView.as_view(), name='incoming-orders'),
+    path("<int:order_id>/status/", OrderStatusUpdateView.as_view(), name='order-status'),
     path("<int:establishment_id>/partner-order-history/", PartnerOrderHistoryView.as_view(),
          name="partner-order-history"),
+    path("<int:establishment_id>/partner-order-export/", PartnerOrderExportView.as_view(),
+         name="partner-order-export"),
     path("", include(router.urls)),
 ]
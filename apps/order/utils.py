@@ -1,15 +1,28 @@
+import threading
+from contextlib import contextmanager
+
 from channels.layers import get_channel_layer
+from django.db import connection, transaction
+from django.db.models import Exists
 from django.utils import timezone
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 import datetime
 
+from apps.order.ledger import get_order_ledger
 from apps.order.models import Order
+from apps.partner.models import Establishment
+from apps.subscription.models import Subscription
 
 from happyhours.utils import CustomValidationError
 
 User = get_user_model()
 
+ORDER_PLACEMENT_LOCK = 1001
+
+# client locks held by the order_placement of the current thread
+_placement = threading.local()
+
 
 # async def send_order_notification(order):
 #     channel_layer = get_channel_layer()
@@ -41,8 +54,7 @@ def validate_order_per_hour(client):
     """
     Client can only place one order per hour
     """
-    one_hour_ago = timezone.localtime() - datetime.timedelta(hours=1)
-    if Order.objects.filter(client=client, order_date__gte=one_hour_ago).exclude(status='cancelled').exists():
+    if get_order_ledger().has_order_last_hour(client.id):
         raise CustomValidationError(
             detail={
                 "error_code": 2,
@@ -55,13 +67,106 @@ def validate_order_per_day(client, establishment):
     """
     Client can only place one order per establishment per day
     """
-    today_min = datetime.datetime.combine(timezone.localtime().date(), datetime.time.min)
-    today_max = datetime.datetime.combine(timezone.localtime().date(), datetime.time.max)
-    if Order.objects.filter(client=client, establishment=establishment,
-                            order_date__range=(today_min, today_max)).exclude(status='cancelled').exists():
+    if get_order_ledger().has_order_today(client.id, establishment.id):
+        raise CustomValidationError(
+            detail={
+                "error_code": 3,
+                "message": "Unable to Make Order"
+            }
+        )
+
+
+def get_order_admission(client, beverage):
+    """
+    Resolve every order eligibility rule with a single query and a single
+    order ledger lookup.
+    Returns the beverage's establishment annotated with
+    has_active_subscription, has_order_last_hour and has_order_today
+    """
+    establishment = Establishment.objects.annotate(
+        has_active_subscription=Exists(
+            Subscription.objects.filter(user=client, is_active=True)
+        ),
+    ).get(pk=beverage.establishment_id)
+    establishment.has_order_last_hour, establishment.has_order_today = get_order_ledger().lookup(
+        client.id, establishment.id
+    )
+
+    # Reuse the loaded establishment so that later accesses skip the lookup
+    beverage.establishment = establishment
+    return establishment
+
+
+@contextmanager
+def order_placement():
+    """
+    Transaction of an order placement. Client locks taken inside are
+    released after the commit, once the on_commit callbacks have written
+    the order ledger, or after a rollback
+    """
+    if getattr(_placement, 'locks', None) is not None:
+        raise RuntimeError("order_placement() does not nest")
+    _placement.locks = []
+    try:
+        with transaction.atomic():
+            yield
+    finally:
+        locks, _placement.locks = _placement.locks, None
+        if locks:
+            with connection.cursor() as cursor:
+                for key in locks:
+                    cursor.execute("SELECT pg_advisory_unlock(%s, %s)", key)
+
+
+def lock_client_orders(client):
+    """
+    Serialize order placement of a single client with a Postgres advisory
+    lock. Inside order_placement() it is a session lock held until the
+    ledger has this order, so the next placement of the client sees it.
+    Elsewhere it lasts until the end of the current transaction.
+    Other clients are never blocked, colliding keys only cost a short wait
+    """
+    locks = getattr(_placement, 'locks', None)
+    key = [ORDER_PLACEMENT_LOCK, client.id % 2 ** 31]
+    with connection.cursor() as cursor:
+        if locks is None:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", key)
+            return
+        cursor.execute("SELECT pg_advisory_lock(%s, %s)", key)
+    locks.append(key)
+
+
+def validate_order_admission(client, beverage):
+    """
+    Run the happy hours, per hour and per day checks for the order
+    with one database round trip. Error codes match the single validators.
+    Must run in the order_placement() of the insert to hold the client lock
+    """
+    lock_client_orders(client)
+    establishment = get_order_admission(client, beverage)
+    validate_order_happyhours(establishment)
+    if establishment.has_order_last_hour:
+        raise CustomValidationError(
+            detail={
+                "error_code": 2,
+                "message": "Unable to Make Order"
+            }
+        )
+    if establishment.has_order_today:
         raise CustomValidationError(
             detail={
                 "error_code": 3,
                 "message": "Unable to Make Order"
             }
         )
+    return establishment
+
+
+def get_ledger_orders():
+    """
+    Non cancelled orders whose per hour or per day windows are still open
+    """
+    now = timezone.localtime()
+    today_min = datetime.datetime.combine(now.date(), datetime.time.min, tzinfo=now.tzinfo)
+    window_start = min(today_min, now - datetime.timedelta(hours=1))
+    return Order.objects.filter(order_date__gte=window_start).exclude(status='cancelled').order_by('order_date')
@@ -1,22 +1,29 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Sum
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
 from drf_spectacular.utils import extend_schema
 from rest_framework import generics
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
-from apps.beverage.models import Beverage
+from apps.order.exports import EXPORT_CONTENT_TYPES, stream_orders
 from apps.order.filters import OrderFilter
 from apps.order.models import Order
+from apps.order.pagination import OrderHistoryPagination
 from apps.order.schema_definitions import order_request_body, place_order_responses, partner_place_order_request_body, \
-    partner_place_order_responses, statistic_response, order_statistics_parameters
+    partner_place_order_responses, statistic_response, order_statistics_parameters, order_export_parameters, \
+    order_export_responses
 from apps.order.serializers import OrderSerializer, OrderHistorySerializer, OwnerOrderSerializer, \
-    IncomingOrderSerializer
+    IncomingOrderSerializer, OrderStatusSerializer
+from apps.order.statistics import get_order_statistics
+from apps.order.transitions import transition_order_status
+from apps.order.utils import order_placement
 from apps.partner.models import Establishment
-from apps.subscription.models import Subscription
 from happyhours.permissions import IsPartnerUser
 
 User = get_user_model()
@@ -39,18 +46,19 @@ class PlaceOrderView(generics.CreateAPIView):
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
 
+    def create(self, request, *args, **kwargs):
+        # Admission checks and the insert share the client's placement lock
+        with order_placement():
+            return super().create(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         user = self.request.user
+        establishment = serializer.validated_data['establishment']
 
-        if not self.user_has_active_subscription(user):
+        if not establishment.has_active_subscription:
             raise PermissionDenied("You need an active subscription to place an order.")
 
-        beverage_id = serializer.validated_data.get("beverage").id
-        beverage = Beverage.objects.get(id=beverage_id)
-        serializer.save(client=user, establishment=beverage.establishment)
-
-    def user_has_active_subscription(self, user):
-        return Subscription.objects.filter(user=user, is_active=True).exists()
+        serializer.save(client=user)
 
 
 @extend_schema(tags=["Orders"], responses={200: OrderHistorySerializer})
@@ -59,14 +67,18 @@ class ClientOrderHistoryView(ReadOnlyModelViewSet):
     ViewSet for viewing a client's own order history.
     Provides endpoints for listing all orders associated
     with the authenticated client and for retrieving details of a specific order.
+
+    Lists are limit/offset paginated, `?pagination=cursor` switches to
+    keyset pagination on (order_date, id) that follows `next` links.
     """
 
     serializer_class = OrderHistorySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OrderHistoryPagination
 
     def get_queryset(self):
         return Order.objects.filter(client=self.request.user).select_related(
-            'establishment', 'beverage', 'client'
+            'establishment', 'client'
         )
 
 
@@ -78,10 +90,12 @@ class PartnerOrderHistoryView(generics.ListAPIView):
     allows retrieving specific orders.
 
     This viewset supports listing all such orders and retrieving details for a specific order.
+    `?pagination=cursor` switches to keyset pagination on (order_date, id).
     """
 
     serializer_class = OrderHistorySerializer
     permission_classes = [IsPartnerUser]
+    pagination_class = OrderHistoryPagination
 
     def get_queryset(self):
         """
@@ -92,7 +106,46 @@ class PartnerOrderHistoryView(generics.ListAPIView):
 
         if establishment.owner != self.request.user:
             raise PermissionDenied("You do not have permission to view these orders.")
-        return Order.objects.filter(establishment=establishment, status__in=['completed', 'cancelled'])
+        return Order.objects.filter(
+            establishment=establishment, status__in=['completed', 'cancelled']
+        ).select_related('establishment', 'client')
+
+
+@extend_schema(tags=["Orders"], parameters=order_export_parameters, responses=order_export_responses)
+class PartnerOrderExportView(generics.GenericAPIView):
+    """
+    Streams all orders of the partner's establishment as CSV or NDJSON,
+    optionally limited with the order_date__gte/lte filters.
+    Rows are read through a server side cursor, so memory use stays flat
+    regardless of the number of orders
+    """
+
+    permission_classes = [IsPartnerUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = OrderFilter
+    pagination_class = None
+
+    def get_queryset(self):
+        establishment = get_object_or_404(Establishment, id=self.kwargs['establishment_id'])
+
+        if establishment.owner != self.request.user:
+            raise PermissionDenied("You do not have permission to view these orders.")
+        return Order.objects.filter(establishment=establishment).order_by('order_date', 'id')
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_CONTENT_TYPES:
+            raise ValidationError({'export_format': f"Choose one of: {', '.join(EXPORT_CONTENT_TYPES)}."})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            stream_orders(queryset, export_format, asynchronous=isinstance(request._request, ASGIRequest)),
+            content_type=EXPORT_CONTENT_TYPES[export_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="orders-{self.kwargs["establishment_id"]}.{export_format}"'
+        )
+        return response
 
 
 @extend_schema(
@@ -105,71 +158,52 @@ class PartnerPlaceOrderView(generics.CreateAPIView):
     serializer_class = OwnerOrderSerializer
     permission_classes = [IsPartnerUser]
 
+    def create(self, request, *args, **kwargs):
+        with order_placement():
+            return super().create(request, *args, **kwargs)
+
     def perform_create(self, serializer):
-        beverage = serializer.validated_data['beverage']
-        establishment = beverage.establishment
-        client = serializer.validated_data['client']
+        establishment = serializer.validated_data['establishment']
 
         if self.request.user != establishment.owner:
             raise PermissionDenied({
                 'error': 'You are not the owner of the establishment linked to this beverage.'
             })
 
-        if not self.user_has_active_subscription(client):
+        if not establishment.has_active_subscription:
             raise PermissionDenied({
                 'error': "Client doesn't have an active subscription"
             })
 
-        serializer.save(establishment=establishment, client=client)
-
-    def user_has_active_subscription(self, user):
-        return Subscription.objects.filter(user=user, is_active=True).exists()
+        serializer.save()
 
 
 @extend_schema(tags=["Orders"], parameters=order_statistics_parameters, responses=statistic_response)
 class OrderStatisticsView(generics.ListAPIView):
     permission_classes = [IsPartnerUser]
+    # list only validates the date range with the filterset, the statistics
+    # are not read through this queryset
+    queryset = Order.objects.none()
     filter_backends = [DjangoFilterBackend]
     filterset_class = OrderFilter
 
-    def get_queryset(self):
-        establishment_id = self.kwargs['establishment_id']
-        establishment = Establishment.objects.get(id=establishment_id)
-        return Order.objects.filter(establishment=establishment)
-
     def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-
-        total_orders = self.get_total_orders(queryset)
-        orders_by_category = self.get_orders_by_category(queryset)
-        total_sum_prices = self.get_total_sum_prices(queryset)
-
-        data = {
-            'total_orders': total_orders,
-            'total_sum_prices': total_sum_prices,
-            'orders_by_category': orders_by_category,
-        }
+        """
+        Complete past days are read from the daily rollup,
+        see apps.order.statistics.get_order_statistics
+        """
+        filterset = self.filterset_class(request.query_params, queryset=self.queryset, request=request)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+
+        data = get_order_statistics(
+            self.kwargs['establishment_id'],
+            filterset.form.cleaned_data.get('order_date__gte'),
+            filterset.form.cleaned_data.get('order_date__lte'),
+        )
 
         return Response(data)
 
-    def get_total_orders(self, queryset):
-        total_orders = queryset.count()
-        return total_orders
-
-    def get_total_sum_prices(self, queryset):
-        return queryset.aggregate(total_sum=Sum('beverage__price'))['total_sum']
-
-    def get_orders_by_category(self, queryset):
-        orders_by_category = (
-            queryset.values('beverage__category__name')
-            .annotate(total_orders=Count('id'))
-            .order_by('beverage__category__name')
-        )
-        return [
-            {'category': stat['beverage__category__name'], 'total_orders': stat['total_orders']}
-            for stat in orders_by_category
-        ]
-
 
 @extend_schema(tags=["Orders"])
 class IncomingOrdersView(generics.ListAPIView):
@@ -186,4 +220,24 @@ class IncomingOrdersView(generics.ListAPIView):
         return Order.objects.filter(
             establishment=establishment,
             status__in=['pending', 'in_preparation']
+        ).select_related('client')
+
+
+@extend_schema(tags=["Orders"], request=OrderStatusSerializer, responses={200: OrderStatusSerializer})
+class OrderStatusUpdateView(generics.GenericAPIView):
+    """
+    Moves an order of the partner's establishment along
+    pending -> in_preparation -> completed, or to cancelled from an open state.
+    Same entry point as the update_order message of the orders WebSocket
+    """
+
+    serializer_class = OrderStatusSerializer
+    permission_classes = [IsPartnerUser]
+
+    def patch(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order = transition_order_status(
+            self.kwargs['order_id'], serializer.validated_data['status'], request.user
         )
+        return Response(self.get_serializer(order).data)
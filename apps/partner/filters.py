@@ -1,37 +1,59 @@
-from django.utils import timezone
 from django_filters import rest_framework as filters
-from django.contrib.gis.geos import Point
-from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.measure import D
 
+from .happy_hours import get_active_happy_hour_q
 from .models import Establishment
+from .utils import KNNDistance, parse_point
 from ..beverage.models import Beverage
 
+# hard cap of near_me and nearest results
+MAX_NEAREST = 100
+
 
 class EstablishmentFilter(filters.FilterSet):
-    near_me = filters.NumberFilter(method="filter_distance")
+    """
+    near_me=<meters> keeps establishments within that distance of
+    latitude/longitude, nearest=<n> keeps the n closest ones. Both order
+    the result nearest first and never return more than MAX_NEAREST rows
+    """
+
+    near_me = filters.NumberFilter(method="filter_nearby_param")
+    nearest = filters.NumberFilter(method="filter_nearby_param", min_value=1)
     happyhours_active = filters.BooleanFilter(method="filter_happyhours_active")
 
     class Meta:
         model = Establishment
         fields = []
 
-    def filter_distance(self, queryset, name, value):
+    def filter_queryset(self, queryset):
+        # the other filters and the search backend, which runs before this
+        # one, have to narrow the rows before the nearest ones are cut off
+        return self.filter_nearby(super().filter_queryset(queryset))
+
+    def filter_nearby_param(self, queryset, name, value):
+        return queryset
+
+    def filter_nearby(self, queryset):
+        radius = self.form.cleaned_data.get("near_me")
+        nearest = self.form.cleaned_data.get("nearest")
         latitude = self.request.query_params.get("latitude", None)
         longitude = self.request.query_params.get("longitude", None)
-        if latitude and longitude and value:
-            latitude = float(latitude)
-            longitude = float(longitude)
-            near_me = float(value)
-            reference_location = Point(longitude, latitude, srid=4326)
-            queryset = queryset.annotate(
-                distance=Distance("location", reference_location)
-            ).filter(distance__lte=near_me)
-        return queryset
+        if not (latitude and longitude and (radius or nearest)):
+            return queryset
+
+        reference_location = parse_point(latitude, longitude)
+        queryset = queryset.filter(location__isnull=False)
+        if radius:
+            # ST_DWithin on the geography column, answered by location_gist
+            queryset = queryset.filter(location__dwithin=(reference_location, D(m=float(radius))))
+        limit = min(int(nearest), MAX_NEAREST) if nearest else MAX_NEAREST
+        knn_distance = KNNDistance("location", reference_location)
+        nearest_ids = queryset.order_by(knn_distance).values("pk")[:limit]
+        return queryset.filter(pk__in=nearest_ids).order_by(knn_distance, "pk")
 
     def filter_happyhours_active(self, queryset, name, value):
-        now = timezone.localtime().time()
         if value:
-            return queryset.filter(happyhours_start__lte=now, happyhours_end__gte=now)
+            return queryset.filter(get_active_happy_hour_q())
         return queryset
 
 
@@ -0,0 +1,42 @@
+from django.db.models import F, Q
+from django.utils import timezone
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def to_minute(value):
+    """
+    Minute of the day of a time
+    """
+    return value.hour * 60 + value.minute
+
+
+def is_minute_in_window(minute, start, end):
+    """
+    Whether minute lies in the inclusive [start, end] window. A window with
+    start after end crosses midnight and is the union of [start, 1439]
+    and [0, end]
+    """
+    if start <= end:
+        return start <= minute <= end
+    return minute >= start or minute <= end
+
+
+def get_happy_hour_q(minute, prefix=""):
+    """
+    Q for establishments in happy hour at minute, is_minute_in_window
+    on the indexed minute columns. prefix reaches them through a relation,
+    e.g. "establishment__"
+    """
+    start = f"{prefix}happyhours_start_minute"
+    end = f"{prefix}happyhours_end_minute"
+    same_day = Q(**{f"{start}__lte": F(end)}) & Q(**{f"{start}__lte": minute, f"{end}__gte": minute})
+    overnight = Q(**{f"{start}__gt": F(end)}) & (Q(**{f"{start}__lte": minute}) | Q(**{f"{end}__gte": minute}))
+    return same_day | overnight
+
+
+def get_active_happy_hour_q(prefix=""):
+    """
+    get_happy_hour_q for the current local minute
+    """
+    return get_happy_hour_q(to_minute(timezone.localtime()), prefix)
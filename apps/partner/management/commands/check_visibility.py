@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.partner.menu import build_menu_snapshots
+from apps.partner.visibility import fix_visibility_mismatches, get_visibility_mismatches
+from happyhours.response_cache import bump_establishment_versions
+
+
+class Command(BaseCommand):
+    help = "Check that is_visible of establishments and beverages matches their owner's block state"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Correct the mismatched rows")
+
+    def handle(self, *args, **options):
+        establishments, beverages = get_visibility_mismatches()
+        counts = establishments.count(), beverages.count()
+        if not any(counts):
+            self.stdout.write(self.style.SUCCESS("Visibility is consistent"))
+            return
+        message = f"{counts[0]} establishments and {counts[1]} beverages have a stale is_visible"
+        if not options["fix"]:
+            raise CommandError(message)
+        with transaction.atomic():
+            establishment_ids = fix_visibility_mismatches()
+        bump_establishment_versions(*establishment_ids)
+        build_menu_snapshots(establishment_ids)
+        self.stdout.write(self.style.SUCCESS(f"Fixed: {message}"))
@@ -1,6 +1,26 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
 
-class EstablishmentManager(models.Manager):
+class EstablishmentQuerySet(models.QuerySet):
+    def with_feedback_count(self):
+        """
+        Annotates feedback_count with a correlated subquery, so joins made by
+        filters and search do not multiply the count
+        """
+        feedback = self.model._meta.get_field('feedback').related_model
+        feedback_count = (
+            feedback.objects.filter(establishment=OuterRef('pk'))
+            .order_by()
+            .values('establishment')
+            .annotate(count=Count('id'))
+            .values('count')
+        )
+        return self.annotate(feedback_count=Coalesce(Subquery(feedback_count), 0))
+
+
+class EstablishmentManager(models.Manager.from_queryset(EstablishmentQuerySet)):
     def get_queryset(self):
-        return super().get_queryset().filter(owner__is_blocked=False)
+        # is_visible mirrors owner__is_blocked, see apps.partner.visibility
+        return super().get_queryset().filter(is_visible=True)
@@ -0,0 +1,90 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# bump when BeverageSerializer output changes
+MENU_SNAPSHOT_VERSION = 1
+
+
+def get_menu_snapshot_key(establishment_id):
+    return f"menu_snapshot:{MENU_SNAPSHOT_VERSION}:{establishment_id}"
+
+
+def get_menu_version_key(establishment_id):
+    return f"menu_snapshot_version:{establishment_id}"
+
+
+def serialize_menus(establishment_ids):
+    """
+    Full menus of the visible establishments among establishment_ids in
+    two queries, as {establishment_id: {"owner_id": ..., "beverages": [...]}}
+    """
+    from ..beverage.models import Beverage
+    from ..beverage.serializers import get_beverage_values, represent_beverage_values
+    from .models import Establishment
+
+    owners = dict(Establishment.objects.filter(id__in=establishment_ids).values_list("id", "owner_id"))
+    snapshots = {pk: {"owner_id": owner_id, "beverages": []} for pk, owner_id in owners.items()}
+    rows = list(get_beverage_values(Beverage.objects.filter(establishment_id__in=owners), "establishment_id"))
+    for row, beverage in zip(rows, represent_beverage_values(rows)):
+        snapshots[row["establishment_id"]]["beverages"].append(beverage)
+    return snapshots
+
+
+def build_menu_snapshots(establishment_ids):
+    """
+    Caches the menus of establishment_ids after a committed write and drops
+    the snapshots of missing or hidden establishments. Bumps their versions
+    first so a miss that read the menus before the write refuses to store
+    them. Returns {establishment_id: snapshot}
+    """
+    establishment_ids = set(establishment_ids)
+    cache.set_many({get_menu_version_key(pk): time.time_ns() for pk in establishment_ids}, timeout=None)
+    snapshots = serialize_menus(establishment_ids)
+    cache.set_many(
+        {get_menu_snapshot_key(pk): snapshot for pk, snapshot in snapshots.items()},
+        timeout=settings.MENU_SNAPSHOT_TIMEOUT,
+    )
+    cache.delete_many([get_menu_snapshot_key(pk) for pk in establishment_ids - snapshots.keys()])
+    return snapshots
+
+
+def build_menu_snapshots_on_commit(establishment_ids):
+    """
+    Rebuilds the menus of establishment_ids once the current transaction
+    commits, so snapshots never hold rolled back or uncommitted rows
+    """
+    establishment_ids = list(establishment_ids)
+    transaction.on_commit(lambda: build_menu_snapshots(establishment_ids))
+
+
+def get_menu_snapshot(establishment_id):
+    """
+    Cached menu snapshot of an establishment, built on a miss.
+    None for missing or hidden establishments
+    """
+    key = get_menu_snapshot_key(establishment_id)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        version_key = get_menu_version_key(establishment_id)
+        version = cache.get(version_key)
+        snapshot = serialize_menus([establishment_id]).get(establishment_id)
+        # a write committed meanwhile may already have cached a newer snapshot
+        # or dropped this one, so only fill an empty key with an unchanged version
+        if snapshot is not None and cache.get(version_key) == version:
+            cache.add(key, snapshot, timeout=settings.MENU_SNAPSHOT_MISS_TIMEOUT)
+    return snapshot
+
+
+def filter_menu(beverages, category=None):
+    """
+    MenuFilter applied to snapshot beverages
+    """
+    if category:
+        category = category.casefold()
+        beverages = [
+            beverage for beverage in beverages if category in (beverage["category"] or "").casefold()
+        ]
+    return beverages
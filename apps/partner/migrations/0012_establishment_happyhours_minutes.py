@@ -0,0 +1,40 @@
+# Generated by Django 4.2 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("partner", "0011_establishment_partner_est_name_ab12cf_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="establishment",
+            name="happyhours_start_minute",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="establishment",
+            name="happyhours_end_minute",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE partner_establishment
+                SET happyhours_start_minute = EXTRACT(HOUR FROM happyhours_start) * 60
+                        + EXTRACT(MINUTE FROM happyhours_start),
+                    happyhours_end_minute = EXTRACT(HOUR FROM happyhours_end) * 60
+                        + EXTRACT(MINUTE FROM happyhours_end)
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="establishment",
+            index=models.Index(
+                fields=["happyhours_start_minute", "happyhours_end_minute"],
+                name="est_happyhours_minute_idx",
+            ),
+        ),
+    ]
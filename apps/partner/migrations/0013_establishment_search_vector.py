@@ -0,0 +1,34 @@
+# Generated by Django 4.2 on 2026-10-18 10:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("partner", "0012_establishment_happyhours_minutes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="establishment",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="establishment",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="est_search_vector_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="establishment",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="est_name_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
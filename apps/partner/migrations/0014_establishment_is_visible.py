@@ -0,0 +1,34 @@
+# Generated by Django 4.2 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("partner", "0013_establishment_search_vector"),
+        ("user", "0006_user_phone_number"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="establishment",
+            name="is_visible",
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE partner_establishment
+                SET is_visible = FALSE
+                WHERE owner_id IS NULL
+                    OR owner_id IN (SELECT id FROM user_user WHERE is_blocked)
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="establishment",
+            index=models.Index(
+                condition=models.Q(("is_visible", True)), fields=["owner"], name="est_visible_owner_idx"
+            ),
+        ),
+    ]
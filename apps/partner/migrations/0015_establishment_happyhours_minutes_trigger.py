@@ -0,0 +1,38 @@
+# Generated by Django 4.2 on 2026-10-18 10:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("partner", "0014_establishment_is_visible"),
+    ]
+
+    operations = [
+        # keeps the minute columns right for writes that skip save(),
+        # e.g. QuerySet.update() or raw SQL
+        migrations.RunSQL(
+            sql="""
+                CREATE FUNCTION partner_establishment_happyhours_minutes() RETURNS trigger AS $$
+                BEGIN
+                    NEW.happyhours_start_minute := COALESCE(
+                        EXTRACT(HOUR FROM NEW.happyhours_start) * 60 + EXTRACT(MINUTE FROM NEW.happyhours_start), 0
+                    );
+                    NEW.happyhours_end_minute := COALESCE(
+                        EXTRACT(HOUR FROM NEW.happyhours_end) * 60 + EXTRACT(MINUTE FROM NEW.happyhours_end), 0
+                    );
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql;
+
+                CREATE TRIGGER partner_establishment_happyhours_minutes
+                BEFORE INSERT OR UPDATE OF happyhours_start, happyhours_end ON partner_establishment
+                FOR EACH ROW EXECUTE FUNCTION partner_establishment_happyhours_minutes();
+            """,
+            reverse_sql="""
+                DROP TRIGGER partner_establishment_happyhours_minutes ON partner_establishment;
+                DROP FUNCTION partner_establishment_happyhours_minutes();
+            """,
+        ),
+    ]
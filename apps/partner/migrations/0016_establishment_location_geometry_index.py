@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-18 10:00
+
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("partner", "0015_establishment_happyhours_minutes_trigger"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="establishment",
+            index=django.contrib.postgres.indexes.GistIndex(
+                django.db.models.functions.comparison.Cast(
+                    "location", django.contrib.gis.db.models.fields.GeometryField(srid=4326)
+                ),
+                name="est_location_geom_idx",
+            ),
+        ),
+    ]
@@ -1,8 +1,12 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex, GistIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Cast
 from django.contrib.gis.db import models as geomodels
 from django.utils import timezone
 
+from apps.partner.happy_hours import is_minute_in_window, to_minute
 from apps.partner.managers import EstablishmentManager
 
 User = get_user_model()
@@ -27,20 +31,66 @@ class Establishment(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE, blank=True, null=True)
     happyhours_start = models.TimeField( blank=True)
     happyhours_end = models.TimeField(blank=True)
+    # minute of the day copies of the happy hour times, see apps.partner.happy_hours.
+    # save() sets them on the instance, a database trigger also covers
+    # QuerySet.update() and raw SQL writes
+    happyhours_start_minute = models.PositiveSmallIntegerField(default=0, editable=False)
+    happyhours_end_minute = models.PositiveSmallIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     modified_at = models.DateTimeField(auto_now=True, null=True)
+    # False while the owner is blocked, see apps.partner.visibility
+    is_visible = models.BooleanField(default=True, editable=False)
+    # name and beverage names, maintained by apps.partner.signals
+    search_vector = SearchVectorField(null=True, editable=False)
     objects = EstablishmentManager()
 
     class Meta:
         indexes = [
             models.Index(fields=['name']),
             models.Index(fields=['owner']),
-            models.Index(name='location_gist', fields=['location'], opclasses=['gist'])
+            models.Index(name='location_gist', fields=['location'], opclasses=['gist']),
+            # planar tile lookups of the map, see apps.partner.viewport
+            GistIndex(Cast('location', geomodels.GeometryField(srid=4326)), name='est_location_geom_idx'),
+            models.Index(
+                fields=['happyhours_start_minute', 'happyhours_end_minute'], name='est_happyhours_minute_idx'
+            ),
+            GinIndex(fields=['search_vector'], name='est_search_vector_idx'),
+            GinIndex(fields=['name'], name='est_name_trgm_idx', opclasses=['gin_trgm_ops']),
+            models.Index(fields=['owner'], name='est_visible_owner_idx', condition=models.Q(is_visible=True)),
         ]
 
     def __str__(self):
         return "Establishment: " + self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # owner as stored, save() re-derives is_visible when it changes
+        instance._loaded_owner_id = instance.__dict__.get('owner_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        for name in ('happyhours_start', 'happyhours_end'):
+            value = self._meta.get_field(name).to_python(getattr(self, name))
+            setattr(self, f'{name}_minute', to_minute(value) if value is not None else 0)
+        derived_fields = {'happyhours_start_minute', 'happyhours_end_minute'}
+        owner_changed = not self._state.adding and self.owner_id != getattr(self, '_loaded_owner_id', None)
+        if self._state.adding or owner_changed:
+            # like the former owner__is_blocked=False join, no owner means hidden
+            self.is_visible = self.owner_id is not None and not self.owner.is_blocked
+            derived_fields.add('is_visible')
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *derived_fields}
+        super().save(*args, **kwargs)
+        self._loaded_owner_id = self.owner_id
+        if owner_changed:
+            from apps.beverage.models import Beverage
+
+            Beverage._base_manager.filter(establishment=self).exclude(is_visible=self.is_visible).update(
+                is_visible=self.is_visible
+            )
+
     def is_happy_hour(self):
-        now = timezone.localtime().time()
-        return self.happyhours_start <= now <= self.happyhours_end
+        now = to_minute(timezone.localtime())
+        return is_minute_in_window(now, self.happyhours_start_minute, self.happyhours_end_minute)
@@ -1,4 +1,12 @@
-from drf_spectacular.utils import OpenApiExample, extend_schema_serializer
+from drf_spectacular.utils import (
+    OpenApiExample,
+    OpenApiParameter,
+    OpenApiResponse,
+    OpenApiTypes,
+    extend_schema_serializer,
+    inline_serializer,
+)
+from rest_framework import serializers
 
 establishment_serializer_schema = extend_schema_serializer(
     examples=[
@@ -104,3 +112,41 @@ menu_serializer_schema = extend_schema_serializer(
         )
     ]
 )
+
+establishment_map_parameters = [
+    OpenApiParameter(
+        name="bbox",
+        description="Viewport as min_lng,min_lat,max_lng,max_lat",
+        required=True,
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+    ),
+    OpenApiParameter(
+        name="zoom",
+        description="Map zoom level, clusters up to 13, single establishments above",
+        required=True,
+        type=OpenApiTypes.INT,
+        location=OpenApiParameter.QUERY,
+    ),
+]
+
+establishment_map_responses = {
+    200: OpenApiResponse(
+        response=inline_serializer(
+            name="EstablishmentMapResponse",
+            fields={
+                "zoom": serializers.IntegerField(),
+                "clustered": serializers.BooleanField(),
+                "clusters": serializers.ListField(
+                    child=serializers.ListField(), required=False,
+                    help_text="[lat, lng, count] per cluster",
+                ),
+                "establishments": serializers.ListField(
+                    child=serializers.ListField(), required=False,
+                    help_text="[id, lat, lng, happy_hour_active] per establishment",
+                ),
+            },
+        ),
+        description="Clusters or establishments of the viewport",
+    ),
+}
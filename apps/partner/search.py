@@ -0,0 +1,61 @@
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from happyhours.search import SEARCH_CONFIG
+
+
+def get_establishment_search_vector(beverage_model):
+    """
+    Establishment name weighted A, names of its beverages B.
+    Models are parameters so migrations can pass historical ones
+    """
+    beverage_names = (
+        beverage_model._base_manager.filter(establishment=OuterRef('pk'))
+        .order_by()
+        .values('establishment')
+        .annotate(names=StringAgg('name', ' '))
+        .values('names')
+    )
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(Coalesce(Subquery(beverage_names), Value('')), weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def get_beverage_search_vector(category_model, establishment_model):
+    """
+    Beverage name weighted A, category name B, establishment name C
+    """
+    category_name = category_model._base_manager.filter(pk=OuterRef('category_id')).values('name')
+    establishment_name = establishment_model._base_manager.filter(pk=OuterRef('establishment_id')).values('name')
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(Subquery(category_name), weight='B', config=SEARCH_CONFIG)
+        + SearchVector(Subquery(establishment_name), weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def update_establishment_search_vectors(**filters):
+    """
+    Recomputes search_vector of the establishments matching filters
+    """
+    from ..beverage.models import Beverage
+    from .models import Establishment
+
+    Establishment._base_manager.filter(**filters).update(
+        search_vector=get_establishment_search_vector(Beverage)
+    )
+
+
+def update_beverage_search_vectors(**filters):
+    """
+    Recomputes search_vector of the beverages matching filters
+    """
+    from ..beverage.models import Beverage, Category
+    from .models import Establishment
+
+    Beverage._base_manager.filter(**filters).update(
+        search_vector=get_beverage_search_vector(Category, Establishment)
+    )
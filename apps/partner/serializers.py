@@ -37,6 +37,9 @@ class BaseEstablishmentSerializer(serializers.ModelSerializer):
         )
 
     def get_feedback_count(self, obj):
+        # list and detail views annotate it with with_feedback_count()
+        if hasattr(obj, "feedback_count"):
+            return obj.feedback_count
         feedback_count = Feedback.objects.filter(establishment=obj).count()
         return feedback_count
 
@@ -0,0 +1,60 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from happyhours.response_cache import bump_establishment_versions
+from .menu import build_menu_snapshots_on_commit
+from .models import Establishment
+from .search import update_beverage_search_vectors, update_establishment_search_vectors
+from ..beverage.models import Beverage, Category
+from ..feedback.models import Feedback
+
+
+@receiver(post_save, sender=Establishment)
+@receiver(post_delete, sender=Establishment)
+def invalidate_establishment_responses(sender, instance, **kwargs):
+    bump_establishment_versions(instance.id)
+
+
+@receiver(post_save, sender=Beverage)
+@receiver(post_delete, sender=Beverage)
+@receiver(post_save, sender=Feedback)
+@receiver(post_delete, sender=Feedback)
+def invalidate_establishment_related_responses(sender, instance, **kwargs):
+    bump_establishment_versions(instance.establishment_id)
+
+
+@receiver(post_save, sender=Establishment)
+def update_establishment_search(sender, instance, created, **kwargs):
+    update_establishment_search_vectors(pk=instance.pk)
+    if not created:
+        # beverage vectors carry the establishment name
+        update_beverage_search_vectors(establishment_id=instance.pk)
+
+
+@receiver(post_save, sender=Beverage)
+@receiver(post_delete, sender=Beverage)
+def update_beverage_search(sender, instance, **kwargs):
+    if kwargs["signal"] is post_save:
+        update_beverage_search_vectors(pk=instance.pk)
+    update_establishment_search_vectors(pk=instance.establishment_id)
+
+
+@receiver(post_save, sender=Category)
+def update_category_search(sender, instance, **kwargs):
+    update_beverage_search_vectors(category_id=instance.pk)
+
+
+@receiver(post_save, sender=Establishment)
+@receiver(post_delete, sender=Establishment)
+@receiver(post_save, sender=Beverage)
+@receiver(post_delete, sender=Beverage)
+def rebuild_menu(sender, instance, **kwargs):
+    build_menu_snapshots_on_commit([instance.pk if sender is Establishment else instance.establishment_id])
+
+
+@receiver(post_save, sender=Category)
+def rebuild_category_menus(sender, instance, created, **kwargs):
+    if not created:
+        build_menu_snapshots_on_commit(
+            Beverage._base_manager.filter(category=instance).values_list("establishment_id", flat=True)
+        )
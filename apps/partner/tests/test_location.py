@@ -90,3 +90,32 @@ class TestEstablishmentLocationView:
             assert response.status_code == status.HTTP_200_OK
             assert len(response.data) == 2
             assert response.data[1]["id"] == self.establishment1.id
+
+    def test_nearest_orders_by_distance_and_caps_results(self):
+        farther = EstablishmentFactory(location=Point(74.70, 42.82463980484438, srid=4326))
+        params = {
+            "latitude": "42.82463980484438",
+            "longitude": "74.61651510051765",
+            "nearest": "2",
+        }
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url, params)
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["id"] for item in response.data] == [self.establishment1.id, farther.id]
+
+        with mock.patch("apps.partner.filters.MAX_NEAREST", 1):
+            response = self.client.get(self.url, {**params, "nearest": "50"})
+        assert [item["id"] for item in response.data] == [self.establishment1.id]
+
+    def test_near_me_is_ordered_nearest_first(self):
+        closer = EstablishmentFactory(location=Point(10.001, 20, srid=4326))
+        params = {"latitude": "20", "longitude": "10.002", "near_me": "1000"}
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url, params)
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["id"] for item in response.data] == [closer.id, self.establishment2.id]
+
+    def test_nearby_with_invalid_coordinates(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url, {"latitude": "abc", "longitude": "10", "nearest": "5"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,92 @@
+import pytest
+from django.contrib.gis.geos import Point
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from happyhours.factories import EstablishmentFactory, UserFactory
+from ..viewport import get_tile_clusters, get_tile_points, get_tiles, MAX_TILES
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    client.force_authenticate(UserFactory(role="client"))
+    return client
+
+
+@pytest.mark.django_db
+def test_map_clusters_at_low_zoom(api_client):
+    for longitude in (74.60, 74.61, 74.62):
+        EstablishmentFactory(location=Point(longitude, 42.87, srid=4326))
+    EstablishmentFactory(location=Point(10, 20, srid=4326))
+
+    response = api_client.get(reverse("v1:establishment-map"), {"bbox": "74,42,75,43", "zoom": "5"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["clustered"] is True
+    assert [cluster[2] for cluster in response.data["clusters"]] == [3]
+    lat, lng, _ = response.data["clusters"][0]
+    assert lat == pytest.approx(42.87)
+    assert lng == pytest.approx(74.61)
+
+
+@pytest.mark.django_db
+def test_map_returns_compact_establishments_at_high_zoom(api_client):
+    establishment = EstablishmentFactory(
+        location=Point(74.6, 42.87, srid=4326), happyhours_start="00:00:00", happyhours_end="23:59:59"
+    )
+    EstablishmentFactory(location=Point(74.7, 42.87, srid=4326))
+
+    response = api_client.get(
+        reverse("v1:establishment-map"), {"bbox": "74.59,42.86,74.61,42.88", "zoom": "15"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["clustered"] is False
+    assert response.data["establishments"] == [[establishment.id, 42.87, 74.6, True]]
+
+
+@pytest.mark.django_db
+def test_map_tiles_are_cached(api_client, django_assert_num_queries):
+    EstablishmentFactory(location=Point(74.6, 42.87, srid=4326))
+    params = {"bbox": "74,42,75,43", "zoom": "5"}
+    api_client.get(reverse("v1:establishment-map"), params)
+
+    with django_assert_num_queries(0):
+        response = api_client.get(reverse("v1:establishment-map"), params)
+    assert [cluster[2] for cluster in response.data["clusters"]] == [1]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", [
+    {"bbox": "74,42,75", "zoom": "5"},
+    {"bbox": "75,42,74,43", "zoom": "5"},
+    {"bbox": "74,42,75,43", "zoom": "99"},
+    {"bbox": "-180,-90,180,90", "zoom": "12"},
+])
+def test_map_rejects_invalid_viewports(api_client, params):
+    response = api_client.get(reverse("v1:establishment-map"), params)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_get_tiles_covers_bbox():
+    assert get_tiles((-180, -90, 180, 90), 0) == [(0, 0)]
+    assert get_tiles((0, 0, 1, 1), 2) == [(2, 1)]
+    assert len(get_tiles((-10, -10, 10, 10), 4)) <= MAX_TILES
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("zoom, x, count", [(0, 0, 3), (1, 0, 1), (1, 1, 2)])
+def test_whole_world_tiles_query_the_database(zoom, x, count):
+    for longitude, latitude in ((-179.5, -89.5), (0.5, 0.5), (179.5, 89.5)):
+        EstablishmentFactory(location=Point(longitude, latitude, srid=4326))
+
+    assert sum(cluster[2] for cluster in get_tile_clusters(zoom, x, 0)) == count
+
+
+@pytest.mark.django_db
+def test_tile_borders_are_constant_latitude():
+    # a great circle between the corners at 45 degrees bulges past 46
+    establishment = EstablishmentFactory(location=Point(22.5, 46, srid=4326))
+
+    assert get_tile_points(3, 4, 2) == []
+    assert [point[0] for point in get_tile_points(3, 4, 3)] == [establishment.id]
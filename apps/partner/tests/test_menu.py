@@ -0,0 +1,133 @@
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from happyhours.factories import BeverageFactory, CategoryFactory, EstablishmentFactory, UserFactory
+from .. import menu
+from ..menu import get_menu_snapshot, get_menu_snapshot_key
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    client.force_authenticate(UserFactory(role="client"))
+    return client
+
+
+def menu_url(establishment):
+    return reverse("v1:menu-list", kwargs={"pk": establishment.pk})
+
+
+@pytest.mark.django_db
+def test_menu_is_served_from_snapshot(api_client, django_assert_num_queries, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        beverage = BeverageFactory(availability_status=True, name="Lager")
+    with django_assert_num_queries(0):
+        response = api_client.get(menu_url(beverage.establishment))
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["name"] for item in response.data] == ["Lager"]
+    assert response.data[0]["price"] == str(beverage.price)
+
+
+@pytest.mark.django_db
+def test_menu_snapshot_is_rebuilt_on_a_miss(api_client):
+    beverage = BeverageFactory(availability_status=True)
+    cache.delete(get_menu_snapshot_key(beverage.establishment_id))
+    assert len(api_client.get(menu_url(beverage.establishment)).data) == 1
+    assert cache.get(get_menu_snapshot_key(beverage.establishment_id)) is not None
+
+
+@pytest.mark.django_db
+def test_beverage_and_category_writes_rebuild_menu(api_client, django_capture_on_commit_callbacks):
+    beverage = BeverageFactory(availability_status=True, name="Lager", category=CategoryFactory(name="Beer"))
+    url = menu_url(beverage.establishment)
+    api_client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        beverage.name = "Stout"
+        beverage.save()
+        BeverageFactory(establishment=beverage.establishment, availability_status=True, name="Cider")
+        beverage.category.name = "Dark beer"
+        beverage.category.save()
+    assert [(item["name"], item["category"]) for item in api_client.get(url).data][1] == ("Stout", "Dark beer")
+    assert len(api_client.get(url).data) == 2
+
+
+@pytest.mark.django_db
+def test_owner_and_public_menus(api_client):
+    owner = UserFactory(role="partner")
+    establishment = EstablishmentFactory(owner=owner)
+    BeverageFactory(establishment=establishment, availability_status=True)
+    BeverageFactory(establishment=establishment, availability_status=False)
+
+    owner_client = APIClient()
+    owner_client.force_authenticate(owner)
+    assert len(owner_client.get(menu_url(establishment)).data) == 2
+    assert len(api_client.get(menu_url(establishment)).data) == 1
+
+
+@pytest.mark.django_db
+def test_menu_category_filter_in_memory(api_client):
+    establishment = EstablishmentFactory()
+    BeverageFactory(establishment=establishment, availability_status=True, category=CategoryFactory(name="Beer"))
+    BeverageFactory(establishment=establishment, availability_status=True, category=CategoryFactory(name="Wine"))
+    response = api_client.get(menu_url(establishment), {"category": "bee"})
+    assert [item["category"] for item in response.data] == ["Beer"]
+    assert api_client.get(menu_url(establishment), {"category": "tea"}).data == []
+
+
+@pytest.mark.django_db
+def test_menu_of_missing_or_hidden_establishment(api_client):
+    owner = UserFactory(role="partner")
+    beverage = BeverageFactory(establishment__owner=owner, availability_status=True)
+    url = menu_url(beverage.establishment)
+    assert api_client.get(url).status_code == status.HTTP_200_OK
+
+    admin = APIClient()
+    admin.force_authenticate(UserFactory(role="admin"))
+    admin.post(reverse("v1:block-user-admin"), {"email": owner.email, "is_blocked": True})
+    assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+    assert api_client.get(reverse("v1:menu-list", kwargs={"pk": 0})).status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_menu_is_rebuilt_after_commit(api_client, django_capture_on_commit_callbacks):
+    beverage = BeverageFactory(availability_status=True, name="Lager")
+    url = menu_url(beverage.establishment)
+    api_client.get(url)
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        beverage.name = "Stout"
+        beverage.save()
+    assert [item["name"] for item in api_client.get(url).data] == ["Lager"]
+
+    for callback in callbacks:
+        callback()
+    assert [item["name"] for item in api_client.get(url).data] == ["Stout"]
+
+
+@pytest.mark.django_db
+def test_miss_does_not_overwrite_a_newer_snapshot(django_capture_on_commit_callbacks):
+    beverage = BeverageFactory(availability_status=True, name="Lager")
+    establishment_id = beverage.establishment_id
+    key = get_menu_snapshot_key(establishment_id)
+    cache.delete(key)
+    serialize_menus = menu.serialize_menus
+
+    def serialize_then_write(establishment_ids):
+        # the miss reads the menu, then a write commits before it stores it
+        snapshots = serialize_menus(establishment_ids)
+        with mock.patch.object(menu, "serialize_menus", serialize_menus):
+            with django_capture_on_commit_callbacks(execute=True):
+                beverage.name = "Stout"
+                beverage.save()
+        return snapshots
+
+    with mock.patch.object(menu, "serialize_menus", serialize_then_write):
+        assert get_menu_snapshot(establishment_id)["beverages"][0]["name"] == "Lager"
+    assert cache.get(key)["beverages"][0]["name"] == "Stout"
+
@@ -1,6 +1,12 @@
+import datetime
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from freezegun import freeze_time
+
 from happyhours.factories import EstablishmentFactory
+from ..happy_hours import get_active_happy_hour_q
 from ..models import Establishment
 
 User = get_user_model()
@@ -20,3 +26,32 @@ class TestEstablishmentModel:
         establishment.save()
         updated = Establishment.objects.get(id=establishment.id)
         assert updated.name == "Updated Name"
+
+
+@pytest.mark.django_db
+class TestEstablishmentHappyHours:
+    def test_minutes_follow_happy_hour_times(self):
+        establishment = EstablishmentFactory(happyhours_start="22:30:00", happyhours_end="02:15:00")
+        assert (establishment.happyhours_start_minute, establishment.happyhours_end_minute) == (1350, 135)
+
+        establishment.happyhours_end = datetime.time(3, 0)
+        establishment.save(update_fields=["happyhours_end"])
+        establishment.refresh_from_db()
+        assert establishment.happyhours_end_minute == 180
+
+    @pytest.mark.parametrize("now, active", [
+        ("2024-05-01 23:00", True),
+        ("2024-05-01 01:00", True),
+        ("2024-05-01 12:00", False),
+    ])
+    def test_overnight_happy_hour(self, now, active):
+        establishment = EstablishmentFactory(happyhours_start="22:00:00", happyhours_end="02:00:00")
+        with freeze_time(timezone.make_aware(datetime.datetime.fromisoformat(now))):
+            assert establishment.is_happy_hour() is active
+            assert Establishment.objects.filter(get_active_happy_hour_q(), pk=establishment.pk).exists() is active
+
+    def test_minutes_follow_bulk_updates(self):
+        establishment = EstablishmentFactory(happyhours_start="17:00:00", happyhours_end="19:00:00")
+        Establishment.objects.filter(pk=establishment.pk).update(happyhours_end=datetime.time(1, 30))
+        establishment.refresh_from_db()
+        assert establishment.happyhours_end_minute == 90
@@ -2,7 +2,9 @@ import pytest
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
-from happyhours.factories import UserFactory, EstablishmentFactory, BeverageFactory
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from happyhours.factories import UserFactory, EstablishmentFactory, BeverageFactory, FeedbackFactory
 from ..models import Establishment
 
 
@@ -124,6 +126,30 @@ class TestEstablishmentAPI:
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data) == 4
 
+    def test_establishment_list_queries_do_not_grow_with_feedback(self):
+        user = UserFactory(role="client")
+        self.client.force_authenticate(user=user)
+        url = reverse("v1:establishments")
+
+        def list_establishments():
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            return response, len(context)
+
+        establishment = EstablishmentFactory()
+        FeedbackFactory.create_batch(2, establishment=establishment)
+        _, queries = list_establishments()
+
+        for _ in range(5):
+            FeedbackFactory.create_batch(3, establishment=EstablishmentFactory())
+        response, more_queries = list_establishments()
+
+        assert more_queries == queries
+        counts = {item["id"]: item["feedback_count"] for item in response.data}
+        assert counts[establishment.id] == 2
+        assert sorted(counts.values())[-6:] == [2, 3, 3, 3, 3, 3]
+
     def test_partner_reaches_max_establishments(self):
         max_establishments = 5
         partner_user = UserFactory(role="partner")
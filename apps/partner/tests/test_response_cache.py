@@ -0,0 +1,58 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from happyhours.factories import EstablishmentFactory, FeedbackFactory, UserFactory
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    client.force_authenticate(UserFactory(role="client"))
+    return client
+
+
+@pytest.mark.django_db
+def test_establishment_list_is_served_from_cache(api_client, django_assert_num_queries):
+    EstablishmentFactory.create_batch(2)
+    url = reverse("v1:establishments")
+    first = api_client.get(url)
+    assert first.status_code == status.HTTP_200_OK
+
+    with django_assert_num_queries(0):
+        second = api_client.get(url)
+    assert second.data == first.data
+
+
+@pytest.mark.django_db
+def test_establishment_list_is_cached_per_query(api_client):
+    EstablishmentFactory(name="Bar One")
+    EstablishmentFactory(name="Pub Two")
+    url = reverse("v1:establishments")
+    assert len(api_client.get(url).data) == 2
+    assert len(api_client.get(url, {"search": "Bar"}).data) == 1
+
+
+@pytest.mark.django_db
+def test_feedback_invalidates_establishment_detail(api_client):
+    establishment = EstablishmentFactory()
+    url = reverse("v1:establishment-detail", kwargs={"pk": establishment.pk})
+    assert api_client.get(url).data["feedback_count"] == 0
+
+    FeedbackFactory(establishment=establishment)
+    assert api_client.get(url).data["feedback_count"] == 1
+
+
+@pytest.mark.django_db
+def test_blocking_owner_invalidates_establishment_list(api_client):
+    owner = UserFactory(role="partner")
+    EstablishmentFactory(owner=owner)
+    url = reverse("v1:establishments")
+    assert len(api_client.get(url).data) == 1
+
+    admin = APIClient()
+    admin.force_authenticate(UserFactory(role="admin"))
+    response = admin.post(reverse("v1:block-user-admin"), {"email": owner.email, "is_blocked": True})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(api_client.get(url).data) == 0
@@ -0,0 +1,71 @@
+import pytest
+from django.contrib.gis.geos import Point
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from unittest import mock
+
+from happyhours.factories import BeverageFactory, EstablishmentFactory, UserFactory
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    client.force_authenticate(UserFactory(role="client"))
+    return client
+
+
+def search(api_client, terms):
+    response = api_client.get(reverse("v1:establishments"), {"search": terms})
+    assert response.status_code == status.HTTP_200_OK
+    return [establishment["name"] for establishment in response.data]
+
+
+@pytest.mark.django_db
+def test_search_by_beverage_name_is_not_duplicated(api_client):
+    establishment = EstablishmentFactory(name="Corner Pub")
+    BeverageFactory(establishment=establishment, name="Dark Lager")
+    BeverageFactory(establishment=establishment, name="Light Lager")
+    EstablishmentFactory(name="Tea House")
+    assert search(api_client, "lager") == ["Corner Pub"]
+
+
+@pytest.mark.django_db
+def test_search_ranks_name_matches_first(api_client):
+    BeverageFactory(establishment=EstablishmentFactory(name="Corner Pub"), name="Lager")
+    EstablishmentFactory(name="Lager House")
+    assert search(api_client, "lager") == ["Lager House", "Corner Pub"]
+
+
+@pytest.mark.django_db
+def test_search_matches_prefixes_and_typos(api_client):
+    EstablishmentFactory(name="Barrel Room")
+    assert search(api_client, "barr") == ["Barrel Room"]
+    assert search(api_client, "barel") == ["Barrel Room"]
+    assert search(api_client, "sushi") == []
+
+
+@pytest.mark.django_db
+def test_search_vector_follows_renames(api_client):
+    establishment = EstablishmentFactory(name="Old Name")
+    beverage = BeverageFactory(establishment=establishment, name="Mojito")
+    establishment.name = "Sunset Bar"
+    establishment.save()
+    beverage.name = "Negroni"
+    beverage.save()
+    assert search(api_client, "sunset negroni") == ["Sunset Bar"]
+    assert search(api_client, "mojito") == []
+
+
+@pytest.mark.django_db
+def test_search_applies_before_the_nearest_cutoff(api_client):
+    EstablishmentFactory(name="Tea House", location=Point(10, 20, srid=4326))
+    EstablishmentFactory(name="Lager House", location=Point(10.01, 20, srid=4326))
+    EstablishmentFactory(name="Lager Yard", location=Point(10.02, 20, srid=4326))
+    params = {"latitude": "20", "longitude": "10", "near_me": "5000", "search": "lager"}
+    with mock.patch("apps.partner.filters.MAX_NEAREST", 1):
+        response = api_client.get(reverse("v1:establishments"), params)
+    assert [establishment["name"] for establishment in response.data] == ["Lager House"]
+
+    response = api_client.get(reverse("v1:establishments"), {**params, "nearest": "2"})
+    assert [establishment["name"] for establishment in response.data] == ["Lager House", "Lager Yard"]
@@ -0,0 +1,102 @@
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from happyhours.factories import BeverageFactory, EstablishmentFactory, UserFactory
+from ..models import Establishment
+from ..visibility import get_visibility_mismatches
+from ...beverage.models import Beverage
+
+
+def block(user, is_blocked=True):
+    admin = APIClient()
+    admin.force_authenticate(UserFactory(role="admin"))
+    response = admin.post(reverse("v1:block-user-admin"), {"email": user.email, "is_blocked": is_blocked})
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_blocking_partner_hides_establishments_and_beverages():
+    owner = UserFactory(role="partner")
+    beverage = BeverageFactory(establishment__owner=owner)
+    other = BeverageFactory(establishment__owner=UserFactory(role="partner"))
+
+    block(owner)
+    assert list(Establishment.objects.all()) == [other.establishment]
+    assert list(Beverage.objects.all()) == [other]
+
+    block(owner, is_blocked=False)
+    assert Establishment.objects.filter(pk=beverage.establishment_id).exists()
+    assert Beverage.objects.filter(pk=beverage.pk).exists()
+
+
+@pytest.mark.django_db
+def test_new_rows_of_blocked_partner_are_hidden():
+    owner = UserFactory(role="partner", is_blocked=True)
+    beverage = BeverageFactory(establishment=EstablishmentFactory(owner=owner))
+    assert not Establishment.objects.exists()
+    assert not Beverage.objects.filter(pk=beverage.pk).exists()
+
+
+@pytest.mark.django_db
+def test_moved_rows_follow_their_new_owner():
+    blocked = UserFactory(role="partner", is_blocked=True)
+    beverage = BeverageFactory(establishment__owner=UserFactory(role="partner"))
+    establishment = Establishment.objects.get(pk=beverage.establishment_id)
+
+    establishment.owner = blocked
+    establishment.save(update_fields=["owner"])
+    assert not Establishment._base_manager.get(pk=establishment.pk).is_visible
+    assert not Beverage._base_manager.get(pk=beverage.pk).is_visible
+
+    beverage = Beverage._base_manager.get(pk=beverage.pk)
+    beverage.establishment = EstablishmentFactory()
+    beverage.save()
+    assert Beverage.objects.filter(pk=beverage.pk).exists()
+
+
+@pytest.mark.django_db
+def test_rows_without_owner_are_hidden():
+    beverage = BeverageFactory(establishment__owner=None)
+    assert not Establishment.objects.filter(pk=beverage.establishment_id).exists()
+    assert not Beverage.objects.filter(pk=beverage.pk).exists()
+    assert [queryset.count() for queryset in get_visibility_mismatches()] == [0, 0]
+
+    establishment = Establishment._base_manager.get(pk=beverage.establishment_id)
+    establishment.owner = UserFactory(role="partner")
+    establishment.save()
+    assert Establishment.objects.filter(pk=establishment.pk).exists()
+    assert Beverage.objects.filter(pk=beverage.pk).exists()
+
+
+@pytest.mark.django_db
+def test_default_managers_do_not_join_users():
+    BeverageFactory()
+    with CaptureQueriesContext(connection) as context:
+        list(Establishment.objects.all())
+        list(Beverage.objects.all())
+    for query in context.captured_queries:
+        assert "JOIN" not in query["sql"]
+
+
+@pytest.mark.django_db
+def test_check_visibility_command():
+    owner = UserFactory(role="partner")
+    beverage = BeverageFactory(establishment__owner=owner)
+    call_command("check_visibility")
+
+    # blocked outside of BlockUserView
+    owner.is_blocked = True
+    owner.save()
+    with pytest.raises(CommandError):
+        call_command("check_visibility")
+
+    call_command("check_visibility", "--fix")
+    establishments, beverages = get_visibility_mismatches()
+    assert not establishments.exists()
+    assert not beverages.exists()
+    assert not Beverage.objects.filter(pk=beverage.pk).exists()
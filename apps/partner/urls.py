@@ -4,6 +4,7 @@ from .views import (
     EstablishmentListCreateView,
     EstablishmentViewSet,
     MenuView, PartnerEstablishmentView,
+    EstablishmentMapView,
 )
 
 urlpatterns = [
@@ -12,6 +13,11 @@ urlpatterns = [
         EstablishmentListCreateView.as_view(),
         name="establishments",
     ),
+    path(
+        "establishments/map/",
+        EstablishmentMapView.as_view(),
+        name="establishment-map",
+    ),
     path(
         "establishments/<int:pk>/",
         EstablishmentViewSet.as_view(
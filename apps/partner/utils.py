@@ -2,6 +2,9 @@ import re
 from io import BytesIO
 import qrcode
 
+from django.contrib.gis.db.models import PointField
+from django.contrib.gis.geos import Point
+from django.db.models import FloatField, Func, Value
 from rest_framework.exceptions import ValidationError
 
 
@@ -15,3 +18,32 @@ def phone_number_validation(validated_data):
     if "phone_number" in validated_data:
         if not re.match(phone_pattern, validated_data["phone_number"]):
             raise ValidationError("Invalid phone number. Must be kgz national format")
+
+
+class KNNDistance(Func):
+    """
+    PostGIS <-> distance operator. Ordering by it lets the location_gist
+    index return rows nearest first instead of sorting every distance
+    """
+
+    arg_joiner = " <-> "
+    template = "%(expressions)s"
+    output_field = FloatField()
+
+    def __init__(self, expression, point, **extra):
+        super().__init__(
+            expression, Value(point, output_field=PointField(srid=point.srid, geography=True)), **extra
+        )
+
+
+def parse_point(latitude, longitude):
+    """
+    Point of the latitude/longitude query parameters
+    """
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        raise ValidationError("Latitude and longitude must be numbers.")
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValidationError("Latitude must be between -90 and 90, longitude between -180 and 180.")
+    return Point(longitude, latitude, srid=4326)
@@ -0,0 +1,144 @@
+import math
+
+from django.contrib.gis.db.models import GeometryField, PointField
+from django.contrib.gis.geos import Polygon
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, FloatField, Func
+from django.db.models.functions import Cast, Floor
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .happy_hours import is_minute_in_window, to_minute
+from .models import Establishment
+
+MAX_ZOOM = 22
+# up to this zoom level tiles hold clusters, above it single establishments
+CLUSTER_MAX_ZOOM = 13
+# clusters are cells of a GRID_CELLS x GRID_CELLS grid per tile
+GRID_CELLS = 8
+MAX_TILES = 64
+TILE_CACHE_TIMEOUT = 60
+
+
+class Longitude(Func):
+    function = "ST_X"
+    output_field = FloatField()
+
+    def __init__(self, expression, **extra):
+        super().__init__(Cast(expression, PointField(srid=4326)), **extra)
+
+
+class Latitude(Longitude):
+    function = "ST_Y"
+
+
+def get_location_geometry():
+    """
+    Planar view of the geography location column. Tile borders are lines
+    of constant latitude there, while geography polygon edges are great
+    circle arcs and can not span 180 degrees. See est_location_geom_idx
+    """
+    return Cast("location", GeometryField(srid=4326))
+
+
+def parse_viewport(bbox, zoom):
+    """
+    (min_lng, min_lat, max_lng, max_lat) and zoom of the query parameters
+    """
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(value) for value in (bbox or "").split(","))
+        zoom = int(zoom)
+    except (TypeError, ValueError):
+        raise ValidationError("bbox must be min_lng,min_lat,max_lng,max_lat and zoom an integer.")
+    if not (-180 <= min_lng <= max_lng <= 180 and -90 <= min_lat <= max_lat <= 90):
+        raise ValidationError("bbox is outside of -180,-90,180,90 or its corners are swapped.")
+    if not 0 <= zoom <= MAX_ZOOM:
+        raise ValidationError(f"zoom must be between 0 and {MAX_ZOOM}.")
+    return (min_lng, min_lat, max_lng, max_lat), zoom
+
+
+def get_tile_size(zoom):
+    """
+    Side of a tile in degrees. Tiles are a plain longitude/latitude grid
+    anchored at -180,-90, every zoom level halves them
+    """
+    return 360 / 2 ** zoom
+
+
+def get_tiles(bbox, zoom):
+    """
+    (x, y) of the tiles of zoom covering bbox
+    """
+    size = get_tile_size(zoom)
+    min_lng, min_lat, max_lng, max_lat = bbox
+    last_x, last_y = math.ceil(360 / size) - 1, math.ceil(180 / size) - 1
+    xs = range(int((min_lng + 180) // size), min(int((max_lng + 180) // size), last_x) + 1)
+    ys = range(int((min_lat + 90) // size), min(int((max_lat + 90) // size), last_y) + 1)
+    if len(xs) * len(ys) > MAX_TILES:
+        raise ValidationError("The bbox covers too many tiles for this zoom level.")
+    return [(x, y) for x in xs for y in ys]
+
+
+def get_tile_queryset(zoom, x, y):
+    size = get_tile_size(zoom)
+    tile = Polygon.from_bbox((
+        x * size - 180, y * size - 90, min((x + 1) * size - 180, 180), min((y + 1) * size - 90, 90)
+    ))
+    tile.srid = 4326
+    return Establishment.objects.annotate(geometry=get_location_geometry()).filter(
+        geometry__bboverlaps=tile
+    ).annotate(lng=Longitude("location"), lat=Latitude("location"))
+
+
+def get_tile_clusters(zoom, x, y):
+    """
+    [lat, lng, count] per non empty grid cell, lat/lng is the mean position
+    """
+    cell = get_tile_size(zoom) / GRID_CELLS
+    rows = (
+        get_tile_queryset(zoom, x, y)
+        .annotate(cell_x=Floor((F("lng") + 180) / cell), cell_y=Floor((F("lat") + 90) / cell))
+        .values("cell_x", "cell_y")
+        .annotate(count=Count("id"), center_lng=Avg("lng"), center_lat=Avg("lat"))
+        .order_by()
+    )
+    return [[round(row["center_lat"], 6), round(row["center_lng"], 6), row["count"]] for row in rows]
+
+
+def get_tile_points(zoom, x, y):
+    """
+    [id, lat, lng, happyhours_start, happyhours_end] per establishment
+    """
+    rows = get_tile_queryset(zoom, x, y).values_list(
+        "id", "lat", "lng", "happyhours_start", "happyhours_end"
+    )
+    return [[pk, round(lat, 6), round(lng, 6), start, end] for pk, lat, lng, start, end in rows]
+
+
+def get_tile(zoom, x, y):
+    """
+    Content of one tile, cached for TILE_CACHE_TIMEOUT seconds
+    """
+    build = get_tile_clusters if zoom <= CLUSTER_MAX_ZOOM else get_tile_points
+    return cache.get_or_set(
+        f"establishment_map:{zoom}:{x}:{y}", lambda: build(zoom, x, y), TILE_CACHE_TIMEOUT
+    )
+
+
+def get_viewport(bbox, zoom):
+    """
+    Clusters or compact establishment tuples of the tiles covering bbox.
+    Whether happy hour is active is evaluated per request, not cached
+    """
+    tiles = get_tiles(bbox, zoom)
+    if zoom <= CLUSTER_MAX_ZOOM:
+        clusters = [cluster for x, y in tiles for cluster in get_tile(zoom, x, y)]
+        return {"zoom": zoom, "clustered": True, "clusters": clusters}
+
+    now = to_minute(timezone.localtime())
+    establishments = {}
+    for x, y in tiles:
+        for pk, lat, lng, start, end in get_tile(zoom, x, y):
+            # a point on a tile edge belongs to both tiles
+            establishments[pk] = [pk, lat, lng, is_minute_in_window(now, to_minute(start), to_minute(end))]
+    return {"zoom": zoom, "clustered": False, "establishments": list(establishments.values())}
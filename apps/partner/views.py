@@ -1,15 +1,15 @@
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
 from rest_framework import viewsets
 from rest_framework.exceptions import PermissionDenied, NotFound
-from rest_framework.filters import SearchFilter
 from rest_framework.generics import (
+    GenericAPIView,
     ListAPIView,
     CreateAPIView,
     RetrieveAPIView,
     UpdateAPIView,
     DestroyAPIView,
-    get_object_or_404,
     ListCreateAPIView,
 )
 
@@ -17,25 +17,35 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSetMixin
 
+from happyhours.search import SearchVectorFilter
+from happyhours.response_cache import (
+    ESTABLISHMENTS_VERSION,
+    VersionedResponseCacheMixin,
+    get_establishment_version_name,
+)
 from happyhours.permissions import (
     IsAdmin,
     IsPartnerOwner,
     IsPartnerUser,
 )
 from .filters import EstablishmentFilter, MenuFilter
+from .happy_hours import to_minute
+from .menu import filter_menu, get_menu_snapshot
+from .schema_definitions import establishment_map_parameters, establishment_map_responses
 from .serializers import (
     EstablishmentSerializer,
     EstablishmentCreateUpdateSerializer,
     # MenuSerializer,
 )
 from .models import Establishment
+from .viewport import get_viewport, parse_viewport
 from ..beverage.models import Beverage
 from ..beverage.serializers import BeverageSerializer
 from ..user.models import User
 
 
 @extend_schema(tags=["Establishments"])
-class EstablishmentListCreateView(ListCreateAPIView):
+class EstablishmentListCreateView(VersionedResponseCacheMixin, ListCreateAPIView):
     """
     Get a list of establishments or create a new establishment.
     - List is accessible to all authenticated users. Partners see only the establishments they own.
@@ -46,28 +56,46 @@ class EstablishmentListCreateView(ListCreateAPIView):
     ensuring that users receive data that is relevant and appropriate to their permissions.
     - Ensures that the partner has not exceeded their limit of owned establishments.
     - Checks data integrity for phone numbers and locations during creation.
+    - `search` matches establishment and beverage names through a tsvector column, ranked and typo tolerant.
+    - Lists are cached until an establishment, beverage or feedback changes.
     """
 
+    cache_prefix = "establishments"
+
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return EstablishmentCreateUpdateSerializer
         return EstablishmentSerializer
 
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    # search first, EstablishmentFilter cuts off the nearest rows last
+    filter_backends = [SearchVectorFilter, DjangoFilterBackend]
     filterset_class = EstablishmentFilter
-    search_fields = ["name", "beverages__name"]
 
     def get_queryset(self):
         user = self.request.user
         if user.role == "partner":
-            return Establishment.objects.filter(owner=user)
-        return Establishment.objects.all()
+            return Establishment.objects.filter(owner=user).with_feedback_count()
+        return Establishment.objects.with_feedback_count()
 
     def get_permissions(self):
         if self.request.method == 'POST':
             return [IsPartnerUser()]
         return [IsAuthenticated()]
 
+    def get_cache_versions(self):
+        return [ESTABLISHMENTS_VERSION]
+
+    def get_cache_variant(self):
+        user = self.request.user
+        variant = f"partner:{user.id}" if user.role == "partner" else "public"
+        if "happyhours_active" in self.request.query_params:
+            # the active set changes with the clock, not only with writes
+            variant += f":{to_minute(timezone.localtime())}"
+        return variant
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
     def perform_create(self, serializer):
         user = self.request.user
         if user.max_establishments <= Establishment.objects.filter(owner=user).count():
@@ -79,7 +107,7 @@ class EstablishmentListCreateView(ListCreateAPIView):
 
 @extend_schema(tags=["Establishments"])
 class EstablishmentViewSet(
-    ViewSetMixin, RetrieveAPIView, UpdateAPIView, DestroyAPIView
+    VersionedResponseCacheMixin, ViewSetMixin, RetrieveAPIView, UpdateAPIView, DestroyAPIView
 ):
     """
     Manages the CRUD operations for establishments. Retrieve is open to all users,
@@ -87,7 +115,8 @@ class EstablishmentViewSet(
     restricted to admins and owners, ensuring operational security and owner control.
     """
 
-    queryset = Establishment.objects.all()
+    queryset = Establishment.objects.with_feedback_count()
+    cache_prefix = "establishment"
 
     def get_serializer_class(self):
         if self.action in ("update", "partial_update"):
@@ -103,40 +132,45 @@ class EstablishmentViewSet(
             permissions = [IsAdmin]
         return [permission() for permission in permissions]
 
+    def get_cache_versions(self):
+        return [get_establishment_version_name(self.kwargs["pk"])]
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
+
 
 @extend_schema(tags=["Establishments"])
 class MenuView(viewsets.ReadOnlyModelViewSet):
     """
     Provides a view of the menu for a specific establishment,
     accessible to all authenticated users.
+    Served from the establishment's menu snapshot, see apps.partner.menu.
+    The owner also sees unavailable beverages.
     """
 
     serializer_class = BeverageSerializer
+    # never queried, list serves the snapshot and applies the filter in
+    # memory, both are declared for the schema
+    queryset = Beverage.objects.none()
     filter_backends = [DjangoFilterBackend]
     filterset_class = MenuFilter
     permission_classes = [IsAuthenticated]
 
-    def get_queryset(self):
-        establishment_id = self.kwargs.get("pk")
-        user = self.request.user
-
-        establishment = get_object_or_404(
-            Establishment.objects.select_related('owner'),
-            id=establishment_id
-        )
-
-        queryset = Beverage.objects.filter(establishment=establishment).select_related("category", "establishment")
-
-        if user != establishment.owner:
-            queryset = queryset.filter(availability_status=True)
-
-        return queryset
-
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        if not queryset.exists():
+        snapshot = get_menu_snapshot(self.kwargs["pk"])
+        if snapshot is None:
+            raise NotFound("No Establishment matches the given query.")
+        beverages = snapshot["beverages"]
+        if request.user.id != snapshot["owner_id"]:
+            beverages = [beverage for beverage in beverages if beverage["availability_status"]]
+        if not beverages:
             raise NotFound("No beverages found for this establishment or establishment does not exist.")
-        return super().list(request, *args, **kwargs)
+        beverages = filter_menu(beverages, request.query_params.get("category"))
+
+        page = self.paginate_queryset(beverages)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(beverages)
 
 
 @extend_schema(tags=["Establishments"])
@@ -146,4 +180,25 @@ class PartnerEstablishmentView(ListAPIView):
 
     def get_queryset(self):
         partner_id = self.kwargs.get("partner_id")
-        return Establishment.objects.filter(owner=partner_id)
+        return Establishment.objects.filter(owner=partner_id).with_feedback_count()
+
+
+@extend_schema(
+    tags=["Establishments"],
+    parameters=establishment_map_parameters,
+    responses=establishment_map_responses,
+)
+class EstablishmentMapView(GenericAPIView):
+    """
+    Establishments of a map viewport in one request.
+    Up to zoom 13 the viewport comes as grid clusters [lat, lng, count],
+    above it as compact [id, lat, lng, happy_hour_active] tuples.
+    Results are built and cached per grid tile, so panning reuses them
+    """
+
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    def get(self, request, *args, **kwargs):
+        bbox, zoom = parse_viewport(request.query_params.get("bbox"), request.query_params.get("zoom"))
+        return Response(get_viewport(bbox, zoom))
@@ -0,0 +1,54 @@
+from django.db.models import Q
+
+
+def set_partner_visibility(owner_id, is_visible):
+    """
+    Shows or hides every establishment and beverage of a partner with two
+    bulk updates. Returns the ids of the establishments
+    """
+    from ..beverage.models import Beverage
+    from .models import Establishment
+
+    establishments = Establishment._base_manager.filter(owner_id=owner_id)
+    establishment_ids = list(establishments.values_list("id", flat=True))
+    establishments.exclude(is_visible=is_visible).update(is_visible=is_visible)
+    Beverage._base_manager.filter(establishment_id__in=establishment_ids).exclude(
+        is_visible=is_visible
+    ).update(is_visible=is_visible)
+    return establishment_ids
+
+
+def get_visibility_mismatches():
+    """
+    Querysets of the establishments and beverages whose is_visible differs
+    from their owner's block state. Rows without an owner are hidden
+    """
+    from ..beverage.models import Beverage
+    from .models import Establishment
+
+    establishments = Establishment._base_manager.filter(
+        Q(is_visible=True) & (Q(owner__isnull=True) | Q(owner__is_blocked=True))
+        | Q(is_visible=False, owner__is_blocked=False)
+    )
+    beverages = Beverage._base_manager.filter(
+        Q(is_visible=True) & (Q(establishment__owner__isnull=True) | Q(establishment__owner__is_blocked=True))
+        | Q(is_visible=False, establishment__owner__is_blocked=False)
+    )
+    return establishments, beverages
+
+
+def fix_visibility_mismatches():
+    """
+    Flips is_visible of the mismatched rows. Returns the ids of the
+    establishments whose establishment or beverages changed
+    """
+    establishments, beverages = get_visibility_mismatches()
+    changed = {
+        *establishments.values_list("pk", flat=True),
+        *beverages.values_list("establishment_id", flat=True),
+    }
+    for queryset in (establishments, beverages):
+        hidden = list(queryset.filter(is_visible=False).values_list("pk", flat=True))
+        queryset.filter(is_visible=True).update(is_visible=False)
+        queryset.model._base_manager.filter(pk__in=hidden).update(is_visible=True)
+    return changed
@@ -1,6 +1,7 @@
 import datetime
 
 from django.contrib.auth import get_user_model
+from django.db import transaction
 
 from drf_spectacular.utils import extend_schema
 from rest_framework import status, filters
@@ -22,6 +23,10 @@ from rest_framework_simplejwt.token_blacklist.models import (
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenViewBase
 
+from apps.order.middleware import revoke_cached_user
+from apps.partner.menu import build_menu_snapshots
+from apps.partner.visibility import set_partner_visibility
+from happyhours.response_cache import bump_establishment_versions
 from happyhours.permissions import (
     IsUserOwner,
     IsPartnerUser,
@@ -398,6 +403,7 @@ class BlockUserView(GenericAPIView):
 
     ### Implementation Details:
     - Throw an error if state did not change
+    - Hides or shows every establishment and beverage of a partner in bulk
 
     """
 
@@ -416,7 +422,16 @@ class BlockUserView(GenericAPIView):
                 tokens = OutstandingToken.objects.filter(user=user)
                 for token in tokens:
                     BlacklistedToken.objects.get_or_create(token=token)
-            user.save()
+            establishment_ids = []
+            with transaction.atomic():
+                user.save()
+                if user.role == "partner":
+                    establishment_ids = set_partner_visibility(user.id, not is_blocked)
+            if is_blocked:
+                revoke_cached_user(user.id)
+            if establishment_ids:
+                bump_establishment_versions(*establishment_ids)
+                build_menu_snapshots(establishment_ids)
             return Response("Successful", status=status.HTTP_200_OK)
         return Response("Impossible", status=status.HTTP_403_FORBIDDEN)
 
@@ -0,0 +1,100 @@
+"""
+Beverage list serialization throughput at 10k rows.
+
+Inserts BEVERAGE_COUNT beverages with a single INSERT ... SELECT
+generate_series, then times BeverageSerializer over a plain queryset
+(one category and establishment lookup per row), over a select_related
+queryset, and the values() read path of get_beverage_values and
+represent_beverage_values. Prints a JSON report with median timings,
+rows per second and query counts. The inserted rows are removed afterwards.
+
+    DJANGO_SETTINGS_MODULE=happyhours.settings.development python benchmarks/bench_beverage_serialization.py
+"""
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'happyhours.settings.development')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from apps.beverage.models import Beverage, Category  # noqa: E402
+from apps.beverage.serializers import (  # noqa: E402
+    BeverageSerializer,
+    get_beverage_values,
+    represent_beverage_values,
+)
+from apps.partner.models import Establishment  # noqa: E402
+from happyhours.factories import UserFactory  # noqa: E402
+
+BEVERAGE_COUNT = int(os.environ.get('BEVERAGE_COUNT', 10000))
+REPEAT = int(os.environ.get('BEVERAGE_REPEAT', 5))
+ESTABLISHMENTS = 100
+
+
+def insert_beverages(owner, category):
+    establishments = Establishment.objects.bulk_create(
+        Establishment(name=f'Bench {n}', owner=owner, happyhours_start='17:00', happyhours_end='19:00')
+        for n in range(ESTABLISHMENTS)
+    )
+    table = connection.ops.quote_name(Beverage._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (name, price, description, availability_status, category_id, establishment_id,
+                                 is_visible)
+            SELECT 'Beverage ' || n, 50 + mod(n, 900), 'Bench', true, %s,
+                   (%s::bigint[])[1 + mod(n, %s)], true
+            FROM generate_series(1, %s) AS n
+            """,
+            [category.id, [establishment.id for establishment in establishments], ESTABLISHMENTS, BEVERAGE_COUNT],
+        )
+
+
+def measure(serialize):
+    timings = []
+    for _ in range(REPEAT):
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            rows = len(serialize())
+            timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    return {
+        'rows': rows,
+        'median_ms': round(median * 1000, 2),
+        'rows_per_second': round(rows / median),
+        'queries': len(context.captured_queries),
+    }
+
+
+def main():
+    owner = UserFactory(role='partner')
+    category = Category.objects.create(name='Bench')
+    try:
+        insert_beverages(owner, category)
+        beverages = Beverage.objects.filter(category=category)
+        results = {
+            'serializer': measure(lambda: BeverageSerializer(beverages.all(), many=True).data),
+            'serializer_select_related': measure(
+                lambda: BeverageSerializer(beverages.select_related('category', 'establishment'), many=True).data
+            ),
+            'values': measure(lambda: represent_beverage_values(get_beverage_values(beverages))),
+        }
+    finally:
+        owner.delete()
+        category.delete()
+
+    print(json.dumps({'beverages': BEVERAGE_COUNT, 'repeat': REPEAT, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Nearby establishment search at 10k and 100k establishments.
+
+For every size, inserts that many establishments at random points around
+Bishkek with a single INSERT ... SELECT generate_series, then times the
+previous Distance annotation filter against EstablishmentFilter's
+ST_DWithin + KNN near_me and nearest modes. Prints a JSON report.
+The inserted rows are removed afterwards.
+
+    DJANGO_SETTINGS_MODULE=happyhours.settings.development python benchmarks/bench_establishment_nearby.py
+"""
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'happyhours.settings.development')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.gis.db.models.functions import Distance  # noqa: E402
+from django.db import connection  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from apps.partner.filters import EstablishmentFilter  # noqa: E402
+from apps.partner.models import Establishment  # noqa: E402
+from apps.partner.utils import parse_point  # noqa: E402
+from happyhours.factories import UserFactory  # noqa: E402
+
+SIZES = [int(size) for size in os.environ.get('NEARBY_SIZES', '10000,100000').split(',')]
+REPEAT = int(os.environ.get('NEARBY_REPEAT', 20))
+LATITUDE, LONGITUDE = 42.8746, 74.5698
+RADIUS = 2000
+
+
+def insert_establishments(owner, count):
+    table = connection.ops.quote_name(Establishment._meta.db_table)
+    with connection.cursor() as cursor:
+        # about +-0.25 degrees around the center, roughly 40x30 km
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (name, location, owner_id, happyhours_start, happyhours_end)
+            SELECT 'Bench ' || n,
+                   ST_SetSRID(ST_MakePoint(%s + random() / 2 - 0.25, %s + random() / 2 - 0.25), 4326)::geography,
+                   %s, time '17:00', time '19:00'
+            FROM generate_series(1, %s) AS n
+            """,
+            [LONGITUDE, LATITUDE, owner.id, count],
+        )
+        cursor.execute(f'ANALYZE {table}')
+
+
+def filtered(params):
+    request = Request(APIRequestFactory().get('/', params))
+    return EstablishmentFilter(params, queryset=Establishment.objects.all(), request=request).qs
+
+
+def distance_filter():
+    point = parse_point(LATITUDE, LONGITUDE)
+    return Establishment.objects.annotate(distance=Distance('location', point)).filter(distance__lte=RADIUS)
+
+
+def measure(build_queryset):
+    timings = []
+    rows = 0
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        rows = len(list(build_queryset().values_list('id', flat=True)))
+        timings.append(time.perf_counter() - started)
+    return {'rows': rows, 'median_ms': round(statistics.median(timings) * 1000, 2)}
+
+
+def main():
+    owner = UserFactory(role='partner')
+    coordinates = {'latitude': str(LATITUDE), 'longitude': str(LONGITUDE)}
+    results = []
+    inserted = 0
+    try:
+        for size in SIZES:
+            insert_establishments(owner, size - inserted)
+            inserted = size
+            results.append({
+                'establishments': size,
+                'distance_annotation': measure(distance_filter),
+                'near_me': measure(lambda: filtered({**coordinates, 'near_me': str(RADIUS)})),
+                'nearest_20': measure(lambda: filtered({**coordinates, 'nearest': '20'})),
+            })
+    finally:
+        owner.delete()
+
+    print(json.dumps({'radius_m': RADIUS, 'repeat': REPEAT, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Delivery latency and throughput of order events on ws/orders/.
+
+Opens --connections OrderConsumer connections through WebsocketCommunicator,
+spread over --establishments establishments (one partner each), creates
+--orders orders round robin over the establishments with Order.objects.create,
+so they go through the post_save signal and the outbox, and drains the outbox
+with dispatch_order_outbox. Latency is measured from the order's commit to
+its arrival on every connection of its establishment.
+Prints a JSON report. Created rows are removed afterwards.
+
+    DJANGO_SETTINGS_MODULE=happyhours.settings.development \\
+        python benchmarks/bench_order_channels.py --connections 200 --establishments 20 --orders 2000
+
+--in-memory swaps the channel layer, the ledger and the event log for their
+in process backends, otherwise the configured Redis is used.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'happyhours.settings.development')
+
+import django  # noqa: E402
+
+django.setup()
+
+from asgiref.sync import sync_to_async  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--connections', type=int, default=100)
+    parser.add_argument('--establishments', type=int, default=10)
+    parser.add_argument('--orders', type=int, default=1000)
+    parser.add_argument('--dispatch-batch-size', type=int, default=100)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--in-memory', action='store_true')
+    return parser.parse_args()
+
+
+def use_in_memory_backends():
+    settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+    settings.ORDER_LEDGER = {'BACKEND': 'apps.order.ledger.LocMemOrderLedger'}
+    settings.ORDER_EVENT_LOG = {'BACKEND': 'apps.order.events.LocMemOrderEventLog'}
+
+
+def create_fixtures(establishment_count):
+    from happyhours.factories import BeverageFactory, UserFactory
+
+    beverages = [
+        BeverageFactory(establishment__owner=UserFactory(role='partner'))
+        for _ in range(establishment_count)
+    ]
+    return beverages, UserFactory(role='client')
+
+
+def remove_fixtures(beverages, client):
+    from apps.order.models import OrderOutbox
+
+    OrderOutbox.objects.filter(client_id=client.id).delete()
+    for beverage in beverages:
+        beverage.establishment.owner.delete()
+    client.delete()
+
+
+def produce_orders(beverages, client, order_count, batch_size, committed_at):
+    """
+    Creates the orders through the signal path and dispatches the outbox
+    after every batch_size orders
+    """
+    from apps.order.models import Order
+    from apps.order.outbox import dispatch_order_outbox
+
+    for index in range(order_count):
+        beverage = beverages[index % len(beverages)]
+        order = Order.objects.create(establishment=beverage.establishment, beverage=beverage, client=client)
+        committed_at[order.id] = time.perf_counter()
+        if (index + 1) % batch_size == 0:
+            while dispatch_order_outbox(batch_size):
+                pass
+    while dispatch_order_outbox(batch_size):
+        pass
+
+
+async def consume(communicator, expected, committed_at, latencies, timeout):
+    for _ in range(expected):
+        frame = await communicator.receive_json_from(timeout=timeout)
+        latencies.append(time.perf_counter() - committed_at[frame['order_id']])
+
+
+def percentile(values, percent):
+    if len(values) < 2:
+        return values[0] if values else None
+    return statistics.quantiles(values, n=100)[percent - 1]
+
+
+async def run(args):
+    from channels.testing import WebsocketCommunicator
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from happyhours.asgi import application
+
+    beverages, client = await sync_to_async(create_fixtures)(args.establishments)
+    communicators = []
+    try:
+        connect_started = time.perf_counter()
+        for index in range(args.connections):
+            beverage = beverages[index % len(beverages)]
+            token = AccessToken.for_user(beverage.establishment.owner)
+            communicator = WebsocketCommunicator(application, f'/ws/orders/?token={token}')
+            connected, _ = await communicator.connect(timeout=args.timeout)
+            assert connected, 'connection rejected'
+            assert (await communicator.receive_json_from(timeout=args.timeout))['type'] == 'order_snapshot'
+            communicators.append((communicator, index % len(beverages)))
+        connect_seconds = time.perf_counter() - connect_started
+
+        orders_per_establishment = [
+            len(range(position, args.orders, len(beverages))) for position in range(len(beverages))
+        ]
+        committed_at = {}
+        latencies = []
+        started = time.perf_counter()
+        consumers = asyncio.gather(*(
+            consume(communicator, orders_per_establishment[position], committed_at, latencies, args.timeout)
+            for communicator, position in communicators
+        ))
+        await sync_to_async(produce_orders)(
+            beverages, client, args.orders, args.dispatch_batch_size, committed_at
+        )
+        await consumers
+        elapsed = time.perf_counter() - started
+    finally:
+        for communicator, _ in communicators:
+            await communicator.disconnect()
+        await sync_to_async(remove_fixtures)(beverages, client)
+
+    return {
+        'channel_layer': settings.CHANNEL_LAYERS['default']['BACKEND'],
+        'connections': args.connections,
+        'establishments': args.establishments,
+        'orders': args.orders,
+        'delivered': len(latencies),
+        'connect_seconds': round(connect_seconds, 3),
+        'connects_per_second': round(args.connections / connect_seconds, 1),
+        'seconds': round(elapsed, 3),
+        'orders_per_second': round(args.orders / elapsed, 1),
+        'deliveries_per_second': round(len(latencies) / elapsed, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50) * 1000, 2),
+            'p99': round(percentile(latencies, 99) * 1000, 2),
+            'max': round(max(latencies) * 1000, 2),
+        },
+    }
+
+
+def main():
+    args = parse_args()
+    if args.in_memory:
+        use_in_memory_backends()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Peak memory of the partner order export.
+
+Inserts ORDER_EXPORT_ROWS orders (default 1M) for a fresh establishment with
+a single INSERT ... SELECT generate_series, then consumes the export stream
+for 10k rows and for all rows and compares the tracemalloc peaks.
+The inserted rows are removed afterwards.
+
+    DJANGO_SETTINGS_MODULE=happyhours.settings.development python benchmarks/bench_order_export.py
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'happyhours.settings.development')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from apps.order.exports import stream_orders  # noqa: E402
+from apps.order.models import Order  # noqa: E402
+from happyhours.factories import BeverageFactory, UserFactory  # noqa: E402
+
+ROWS = int(os.environ.get('ORDER_EXPORT_ROWS', 1_000_000))
+SMALL_ROWS = 10_000
+
+
+def insert_orders(beverage, client, count):
+    table = connection.ops.quote_name(Order._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table}
+                (establishment_id, beverage_id, client_id, order_date, status, beverage_name, category_name, price)
+            SELECT %s, %s, %s, %s - n * interval '1 second', 'completed', %s, %s, %s
+            FROM generate_series(1, %s) AS n
+            """,
+            [beverage.establishment_id, beverage.id, client.id, timezone.now(),
+             beverage.name, beverage.category.name, beverage.price, count],
+        )
+
+
+def measure(queryset, export_format):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = 0
+    with transaction.atomic():
+        for chunk in stream_orders(queryset, export_format):
+            size += len(chunk)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': round(elapsed, 3), 'bytes': size, 'peak_kib': peak // 1024}
+
+
+def main():
+    beverage = BeverageFactory()
+    client = UserFactory(role='client')
+    insert_orders(beverage, client, ROWS)
+    try:
+        orders = Order.objects.filter(establishment_id=beverage.establishment_id).order_by('order_date', 'id')
+        cutoff = timezone.now() - timedelta(seconds=SMALL_ROWS)
+        results = {}
+        for export_format in ('csv', 'ndjson'):
+            results[export_format] = {
+                'small': measure(orders.filter(order_date__gt=cutoff), export_format),
+                'full': measure(orders, export_format),
+            }
+    finally:
+        beverage.establishment.delete()
+        client.delete()
+
+    print(json.dumps({'rows': ROWS, 'small_rows': SMALL_ROWS, 'results': results}, indent=2))
+    for export_format, result in results.items():
+        # flat memory: the full export may not need much more than the small one
+        assert result['full']['peak_kib'] < 2 * result['small']['peak_kib'] + 1024, export_format
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Establishment and beverage search, SearchFilter against SearchVectorFilter.
+
+For every size, inserts that many establishments with BEVERAGES_PER
+beverages each with INSERT ... SELECT generate_series, fills their search
+vectors, then times an exact word, a prefix and a misspelled search through
+the ILIKE SearchFilter the views used before and through SearchVectorFilter.
+Prints a JSON report with median timings and returned rows. The inserted
+rows are removed afterwards.
+
+    DJANGO_SETTINGS_MODULE=happyhours.settings.development python benchmarks/bench_search.py
+"""
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'happyhours.settings.development')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from rest_framework.filters import SearchFilter  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from apps.beverage.models import Beverage, Category  # noqa: E402
+from apps.partner.models import Establishment  # noqa: E402
+from apps.partner.search import update_beverage_search_vectors, update_establishment_search_vectors  # noqa: E402
+from happyhours.factories import UserFactory  # noqa: E402
+from happyhours.search import SearchVectorFilter  # noqa: E402
+
+SIZES = [int(size) for size in os.environ.get('SEARCH_SIZES', '10000,100000').split(',')]
+BEVERAGES_PER = int(os.environ.get('SEARCH_BEVERAGES_PER', 5))
+REPEAT = int(os.environ.get('SEARCH_REPEAT', 20))
+TERMS = {'word': 'lager', 'prefix': 'lag', 'typo': 'lagre'}
+WORDS = ['lager', 'stout', 'mojito', 'negroni', 'cider', 'porter', 'spritz', 'martini']
+
+
+class View:
+    def __init__(self, search_fields):
+        self.search_fields = search_fields
+
+
+def insert_rows(owner, category, start, count):
+    establishments = connection.ops.quote_name(Establishment._meta.db_table)
+    beverages = connection.ops.quote_name(Beverage._meta.db_table)
+    words = 'ARRAY[%s]' % ', '.join(['%s'] * len(WORDS))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {establishments} (name, owner_id, happyhours_start, happyhours_end,
+                                          happyhours_start_minute, happyhours_end_minute)
+            SELECT 'Bench ' || n || ' ' || ({words})[1 + mod(n, {len(WORDS)})],
+                   %s, time '17:00', time '19:00', 1020, 1140
+            FROM generate_series(%s, %s) AS n
+            """,
+            [*WORDS, owner.id, start + 1, start + count],
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO {beverages} (name, price, description, availability_status, category_id, establishment_id)
+            SELECT ({words})[1 + mod(e.id + n, {len(WORDS)})] || ' ' || n, 100, '', true, %s, e.id
+            FROM {establishments} e, generate_series(1, %s) AS n
+            WHERE e.owner_id = %s AND e.search_vector IS NULL
+            """,
+            [*WORDS, category.id, BEVERAGES_PER, owner.id],
+        )
+    update_establishment_search_vectors(owner=owner, search_vector__isnull=True)
+    update_beverage_search_vectors(establishment__owner=owner, search_vector__isnull=True)
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {establishments}')
+        cursor.execute(f'ANALYZE {beverages}')
+
+
+def searched(backend, queryset, search_fields, terms):
+    request = Request(APIRequestFactory().get('/', {'search': terms}))
+    return backend().filter_queryset(request, queryset, View(search_fields))
+
+
+def measure(build_queryset):
+    timings = []
+    rows = 0
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        rows = len(list(build_queryset().values_list('id', flat=True)))
+        timings.append(time.perf_counter() - started)
+    return {'rows': rows, 'median_ms': round(statistics.median(timings) * 1000, 2)}
+
+
+def compare(queryset, search_fields):
+    return {
+        name: {
+            'search_filter': measure(lambda: searched(SearchFilter, queryset, search_fields, terms)),
+            'search_vector_filter': measure(lambda: searched(SearchVectorFilter, queryset, search_fields, terms)),
+        }
+        for name, terms in TERMS.items()
+    }
+
+
+def main():
+    owner = UserFactory(role='partner')
+    category = Category.objects.create(name='Bench')
+    results = []
+    inserted = 0
+    try:
+        for size in SIZES:
+            insert_rows(owner, category, inserted, size - inserted)
+            inserted = size
+            results.append({
+                'establishments': size,
+                'beverages': size * BEVERAGES_PER,
+                'establishment_search': compare(
+                    Establishment.objects.filter(owner=owner), ['name', 'beverages__name']
+                ),
+                'beverage_search': compare(
+                    Beverage.objects.filter(establishment__owner=owner),
+                    ['name', 'category__name', 'establishment__name'],
+                ),
+            })
+    finally:
+        owner.delete()
+        category.delete()
+
+    print(json.dumps({'repeat': REPEAT, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def order_ledger(settings):
+    """
+    Every test gets a fresh in process order ledger
+    """
+    from apps.order.ledger import get_order_ledger
+
+    settings.ORDER_LEDGER = {'BACKEND': 'apps.order.ledger.LocMemOrderLedger'}
+    return get_order_ledger()
+
+
+@pytest.fixture(autouse=True)
+def order_event_log(settings):
+    """
+    Every test gets a fresh in process order event log
+    """
+    from apps.order.events import get_order_event_log
+
+    settings.ORDER_EVENT_LOG = {'BACKEND': 'apps.order.events.LocMemOrderEventLog'}
+    return get_order_event_log()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Cached responses and version counters do not leak between tests
+    """
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def create_extensions(sender, using, **kwargs):
+    """
+    --nomigrations skips TrigramExtension, the trigram indexes of the
+    tables need pg_trgm before they are created
+    """
+    from django.db import connections
+
+    if sender.label != 'partner':
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+
+def install_migration_sql(sender, using, **kwargs):
+    """
+    --nomigrations creates the tables straight from the models, so the
+    RunSQL operations the models rely on are replayed once the tables exist
+    """
+    from importlib import import_module
+
+    from django.db import connections
+
+    if sender.label != 'partner':
+        return
+    migration = import_module('apps.partner.migrations.0015_establishment_happyhours_minutes_trigger').Migration
+    with connections[using].cursor() as cursor:
+        for operation in migration.operations:
+            cursor.execute(operation.sql)
+
+
+@pytest.fixture(scope='session', autouse=True)
+def migration_sql():
+    from django.db.models.signals import post_migrate, pre_migrate
+
+    pre_migrate.connect(create_extensions, dispatch_uid='conftest_create_extensions')
+    post_migrate.connect(install_migration_sql, dispatch_uid='conftest_install_migration_sql')
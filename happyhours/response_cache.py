@@ -0,0 +1,77 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+ESTABLISHMENTS_VERSION = 'establishments'
+
+
+def get_establishment_version_name(establishment_id):
+    return f'establishment:{establishment_id}'
+
+
+def get_version_key(name):
+    return f'response_version:{name}'
+
+
+def get_versions(names):
+    """
+    Current values of the named version counters in one round trip.
+    Missing counters are started, so an evicted counter never comes back
+    with a value that older cached responses were stored under
+    """
+    keys = [get_version_key(name) for name in names]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*names):
+    """
+    Invalidates every response cached under the named versions
+    """
+    cache.set_many({get_version_key(name): time.time_ns() for name in names}, timeout=None)
+
+
+def bump_establishment_versions(*establishment_ids):
+    bump_versions(ESTABLISHMENTS_VERSION, *map(get_establishment_version_name, establishment_ids))
+
+
+class VersionedResponseCacheMixin:
+    """
+    Caches successful GET responses of a view under its prefix, a variant,
+    the versions of get_cache_versions, the host and the query string.
+    Writes bump the versions, see apps.partner.signals
+    """
+
+    cache_prefix = None
+
+    def get_cache_versions(self):
+        return [ESTABLISHMENTS_VERSION]
+
+    def get_cache_variant(self):
+        return 'public'
+
+    def get_cache_key(self):
+        request = self.request
+        versions = ':'.join(str(version) for version in get_versions(self.get_cache_versions()))
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        digest = hashlib.md5(f'{request.get_host()}{request.path}?{query}'.encode()).hexdigest()
+        return f'response:{self.cache_prefix}:{self.get_cache_variant()}:{versions}:{digest}'
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_cache_key()
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
@@ -0,0 +1,70 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import F, Q
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+# names are a mix of Russian, Kyrgyz and English, so no stemming
+SEARCH_CONFIG = 'simple'
+MAX_SEARCH_LENGTH = 100
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def get_search_query(terms):
+    """
+    Prefix tsquery matching every word of terms, None without words
+    """
+    words = WORD_PATTERN.findall(terms.lower())
+    if not words:
+        return None
+    return SearchQuery(' & '.join(f'{word}:*' for word in words), search_type='raw', config=SEARCH_CONFIG)
+
+
+class SearchVectorFilter(BaseFilterBackend):
+    """
+    Full text search on a maintained tsvector column, with typo tolerance
+    through a pg_trgm word similarity match on a name column. Both use
+    GIN indexes and no joins, so rows are not duplicated. The trigram
+    match uses the <% operator, see pg_trgm.word_similarity_threshold.
+    Results are ordered by rank unless the queryset is already ordered
+
+    Views set search_vector_field (default "search_vector") and
+    search_trigram_field (default "name")
+    """
+
+    search_param = api_settings.SEARCH_PARAM
+    search_title = 'Search'
+    search_description = 'Words or word prefixes to search for, tolerates typos.'
+
+    def get_search_terms(self, request):
+        return request.query_params.get(self.search_param, '').strip()[:MAX_SEARCH_LENGTH]
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        query = get_search_query(terms)
+        if query is None:
+            return queryset
+
+        vector_field = getattr(view, 'search_vector_field', 'search_vector')
+        trigram_field = getattr(view, 'search_trigram_field', 'name')
+        queryset = queryset.filter(
+            Q(**{vector_field: query}) | Q(**{f'{trigram_field}__trigram_word_similar': terms})
+        ).annotate(
+            search_rank=SearchRank(F(vector_field), query) + TrigramWordSimilarity(terms, trigram_field)
+        )
+        if queryset.query.order_by:
+            # views that order their queryset keep that order
+            return queryset
+        return queryset.order_by('-search_rank', 'pk')
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.search_param,
+                'required': False,
+                'in': 'query',
+                'description': self.search_description,
+                'schema': {'type': 'string'},
+            },
+        ]
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     'django.contrib.gis',
+    'django.contrib.postgres',
     # dependencies
     "corsheaders",
     'django_filters',
@@ -206,11 +207,71 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 CORS_ALLOW_ALL_ORIGINS = True
 ASGI_APPLICATION = 'happyhours.asgi.application'
-CHANNEL_LAYERS = {
+# Comma separated Redis URLs, channels are sharded across all of them.
+# The order ledger and event log use the first one
+REDIS_HOSTS = os.getenv('REDIS_HOSTS', 'redis://redis:6379').split(',')
+# "core" keeps messages in Redis lists with capacity and group expiry,
+# "pubsub" delivers through Redis Pub/Sub without per channel storage
+CHANNEL_LAYER_TYPE = os.getenv('CHANNEL_LAYER_TYPE', 'core')
+if CHANNEL_LAYER_TYPE == 'pubsub':
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.pubsub.RedisPubSubChannelLayer',
+            'CONFIG': {
+                "hosts": REDIS_HOSTS,
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                "hosts": REDIS_HOSTS,
+                "capacity": int(os.getenv('CHANNEL_LAYER_CAPACITY', 1500)),
+                "expiry": int(os.getenv('CHANNEL_LAYER_EXPIRY', 60)),
+                "group_expiry": int(os.getenv('CHANNEL_LAYER_GROUP_EXPIRY', 86400)),
+            },
+        },
+    }
+# seconds between group_add refreshes of long lived WebSocket connections,
+# well below group_expiry
+ORDER_GROUP_REFRESH_INTERVAL = int(os.getenv('ORDER_GROUP_REFRESH_INTERVAL', 3600))
+ORDER_LEDGER = {
+    'BACKEND': 'apps.order.ledger.RedisOrderLedger',
+    'OPTIONS': {
+        'key_prefix': 'order_ledger',
+    },
+}
+CACHES = {
     'default': {
-        'BACKEND': 'channels_redis.core.RedisChannelLayer',
-        'CONFIG': {
-            "hosts": [('redis', 6379)],
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_CACHE_URL', 'redis://redis:6379/1'),
+        'KEY_PREFIX': 'happyhours',
+    },
+}
+# seconds a versioned establishment or menu response stays cached
+RESPONSE_CACHE_TIMEOUT = 300
+# seconds a menu snapshot rebuilt after a write stays cached
+MENU_SNAPSHOT_TIMEOUT = 60 * 60 * 24
+# seconds a menu snapshot built on a cache miss stays cached
+MENU_SNAPSHOT_MISS_TIMEOUT = 60
+# seconds a WebSocket connection's user is cached per access token
+WS_AUTH_CACHE_TTL = 60
+ORDER_EVENT_LOG = {
+    'BACKEND': 'apps.order.events.RedisOrderEventLog',
+    'OPTIONS': {
+        'key_prefix': 'order_events',
+        'buffer_size': 500,
+    },
+}
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'loggers': {
+        # over capacity group sends are info records, counted by apps.order.metrics
+        'channels_redis.core': {
+            'level': 'INFO',
         },
     },
 }
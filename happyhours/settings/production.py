@@ -58,6 +58,10 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        # over capacity group sends are info records, counted by apps.order.metrics
+        'channels_redis.core': {
+            'level': 'INFO',
+        },
     },
 }
 
@@ -15,6 +15,18 @@ DATABASES = {
   }
 }
 
+ORDER_LEDGER = {
+    'BACKEND': 'apps.order.ledger.LocMemOrderLedger',
+}
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+ORDER_EVENT_LOG = {
+    'BACKEND': 'apps.order.events.LocMemOrderEventLog',
+}
+
 
 if 'test' in sys.argv or 'test_coverage' in sys.argv:
     DATABASES['default']['NAME'] = 'test_myapp'
@@ -1,3 +1,5 @@
+import redis
+from django.conf import settings
 from rest_framework import exceptions
 
 
@@ -12,3 +14,22 @@ class CustomValidationError(exceptions.APIException):
         if detail is None:
             detail = self.default_detail
         super().__init__(detail=detail)
+
+
+_redis_connection = None
+
+
+def get_redis_connection():
+    """
+    Shared Redis client for the first host configured in CHANNEL_LAYERS
+    """
+    global _redis_connection
+    if _redis_connection is None:
+        host = settings.CHANNEL_LAYERS['default']['CONFIG']['hosts'][0]
+        if isinstance(host, str):
+            _redis_connection = redis.Redis.from_url(host)
+        elif isinstance(host, dict):
+            _redis_connection = redis.Redis.from_url(host['address'])
+        else:
+            _redis_connection = redis.Redis(host=host[0], port=host[1])
+    return _redis_connection